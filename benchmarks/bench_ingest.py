@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark parallel ingestion of StatsBomb event files.
+
+Builds a synthetic multi-match directory by cloning the event files in data/
+under new match ids, then times load_statsbomb_data with 1..N worker processes.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.load_and_parse import load_statsbomb_data
+
+
+def build_corpus(source_dir, target_dir, n_matches):
+    """Fill ``target_dir`` with ``n_matches`` event files cloned from ``source_dir``"""
+    sources = sorted(Path(source_dir).glob('**/*events*.json'))
+    if not sources:
+        raise SystemExit(f"No events JSON files found in {source_dir}")
+    target_dir = Path(target_dir)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(n_matches):
+        target = target_dir / f'events_{100000 + i}.json'
+        source = sources[i % len(sources)]
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+    return target_dir
+
+
+def worker_counts(max_workers):
+    counts = [1]
+    while counts[-1] * 2 < max_workers:
+        counts.append(counts[-1] * 2)
+    if max_workers > 1:
+        counts.append(max_workers)
+    return counts
+
+
+def time_load(data_dir, workers, use_cache):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        df_shots, df_passes = load_statsbomb_data(data_dir, use_cache=use_cache, workers=workers)
+        elapsed = time.perf_counter() - start
+    return elapsed, len(df_shots), len(df_passes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark multi-process ingestion of StatsBomb event files')
+    parser.add_argument('--matches', '-n', type=int, default=300, help='Number of synthetic matches to ingest')
+    parser.add_argument('--max-workers', '-w', type=int, default=os.cpu_count() or 1, help='Largest worker count to time')
+    parser.add_argument('--source-dir', type=str, default='data', help='Directory with event files to clone')
+    parser.add_argument('--use-cache', action='store_true', help='Time warm Parquet-store reads instead of raw JSON parsing')
+    parser.add_argument('--output', '-o', type=str, help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = build_corpus(args.source_dir, Path(tmp) / 'data', args.matches)
+        if args.use_cache:
+            time_load(corpus, args.max_workers, use_cache=True)
+
+        results = []
+        print(f"Ingesting {args.matches} matches ({'parquet store' if args.use_cache else 'raw JSON'})")
+        print(f"{'Workers':<8} {'Seconds':<9} {'Speedup':<8} {'Shots':<8} {'Passes':<8}")
+        for workers in worker_counts(args.max_workers):
+            elapsed, n_shots, n_passes = time_load(corpus, workers, args.use_cache)
+            speedup = results[0]['seconds'] / elapsed if results else 1.0
+            results.append({'workers': workers, 'seconds': round(elapsed, 4), 'speedup': round(speedup, 2),
+                            'shots': n_shots, 'passes': n_passes})
+            print(f"{workers:<8} {elapsed:<9.2f} {speedup:<8.2f} {n_shots:<8} {n_passes:<8}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'matches': args.matches, 'use_cache': args.use_cache, 'results': results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Benchmark the loader, metric and rendering hot paths on synthetic corpora.
+
+Each corpus size gets a directory of StatsBomb-shaped event files written by
+scripts/synthetic_data.py. Every benchmark is timed over several repeats and
+run once more under tracemalloc for its peak allocation. Unless its name ends
+in [warm], each run starts cold: the frames are fresh copies with nothing
+cached on them and renderers are new, so the timings and peaks are cold ones.
+Results are written as JSON and can be compared against a saved baseline; any
+benchmark slower than the baseline by more than --threshold makes the run
+exit non-zero.
+
+    python benchmarks/run_benchmarks.py --sizes 10 100 --output bench.json
+    python benchmarks/run_benchmarks.py --baseline bench.json --threshold 0.2
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.load_and_parse import (
+    load_statsbomb_data, get_top_shot_takers, get_top_progressive_passers, get_player_comparison,
+    get_team_performance_summary, get_position_heatmap_data,
+)
+from scripts.event_store import default_store_dir
+from scripts.group_index import get_group_index, register_group_index
+from scripts.synthetic_data import write_synthetic_corpus
+from visualizations.shot_map_visualizer import ShotMapRenderer, create_shot_map
+
+DEFAULT_SIZES = [10, 100, 1000]
+CORPUS_SEED = 7
+
+
+def corpus_dir(root, n_matches):
+    """Return a synthetic corpus of ``n_matches`` under ``root``, writing it if missing"""
+    path = Path(root) / f'{n_matches}_matches'
+    if len(list(path.glob('events_*.json'))) != n_matches:
+        print(f"Writing synthetic corpus with {n_matches} matches to {path}")
+        write_synthetic_corpus(path, n_matches=n_matches, seed=CORPUS_SEED, n_teams=max(2, min(n_matches, 20)))
+    return path
+
+
+def quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def measure(func, repeat, setup=None):
+    """Time ``func`` ``repeat`` times, then once more under tracemalloc for peak memory.
+
+    ``setup`` runs untimed before every call, including the traced one, and
+    its result is passed to ``func``.
+    """
+    def prepare():
+        if setup is None:
+            bound = func
+        else:
+            state = quiet(setup)
+            bound = lambda: func(state)
+        gc.collect()
+        return bound
+
+    timings = []
+    for _ in range(repeat):
+        bound = prepare()
+        start = time.perf_counter()
+        quiet(bound)
+        timings.append(time.perf_counter() - start)
+    bound = prepare()
+    tracemalloc.start()
+    quiet(bound)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'first_seconds': round(timings[0], 6),
+        'best_seconds': round(min(timings), 6),
+        'median_seconds': round(statistics.median(timings), 6),
+        'peak_mb': round(peak / 2 ** 20, 3),
+    }
+
+
+def fresh_frames(df_shots, df_passes):
+    """Copies of the loaded frames without the metric tables and pass flags cached on the originals"""
+    # The group index comes with every load, so the copies keep it
+    return tuple(register_group_index(df.copy(), get_group_index(df)) for df in (df_shots, df_passes))
+
+
+def benchmark_cases(data_dir):
+    """Yield ``(name, func, setup)`` for every hot path on one corpus; see ``measure``"""
+    yield 'load_statsbomb_data[cold]', lambda _: load_statsbomb_data(data_dir), \
+        lambda: shutil.rmtree(default_store_dir(data_dir), ignore_errors=True)
+    yield 'load_statsbomb_data[warm]', lambda: load_statsbomb_data(data_dir), None
+
+    df_shots, df_passes = quiet(load_statsbomb_data, data_dir)
+    players = get_top_shot_takers(df_shots, top_n=2)['player.name'].tolist()
+    team = df_shots['team.name'].iloc[0]
+    fresh = lambda: fresh_frames(df_shots, df_passes)
+
+    yield 'get_top_shot_takers', lambda frames: get_top_shot_takers(frames[0]), fresh
+    yield 'get_top_progressive_passers', lambda frames: get_top_progressive_passers(frames[1]), fresh
+    yield 'get_player_comparison', lambda frames: get_player_comparison(*frames, players[0], players[-1]), fresh
+    yield 'get_team_performance_summary', lambda frames: get_team_performance_summary(*frames, team), fresh
+    yield 'get_position_heatmap_data', lambda frames: get_position_heatmap_data(*frames, players[0]), fresh
+
+    # Drawing is deferred until the figure is saved, so the map is saved to memory
+    yield 'create_shot_map', lambda frames: create_shot_map(frames[0], players[0], save_path=io.BytesIO(), dpi=100), \
+        fresh
+
+    renderer = ShotMapRenderer()
+    quiet(renderer.render, df_shots, players[0])
+    yield 'ShotMapRenderer.render[cold]', lambda args: args[0].render(args[1][0], players[0]), \
+        lambda: (ShotMapRenderer(), fresh())
+    yield 'ShotMapRenderer.render[warm]', lambda: renderer.render(df_shots, players[0]), None
+
+
+def run(sizes, repeat, root):
+    results = []
+    for n_matches in sizes:
+        data_dir = corpus_dir(root, n_matches)
+        for name, func, setup in benchmark_cases(data_dir):
+            stats = measure(func, repeat, setup)
+            results.append({'name': name, 'matches': n_matches, **stats})
+            print(f"{name:<32} {n_matches:>6} {stats['best_seconds']:>10.4f}s {stats['peak_mb']:>10.1f} MB")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print per-benchmark ratios of best (cold unless [warm]) times against ``baseline``; return the regressions"""
+    previous = {(r['name'], r['matches']): r for r in baseline['results']}
+    regressions = []
+    print(f"\n{'Benchmark':<32} {'Matches':>7} {'Baseline':>10} {'Current':>10} {'Ratio':>7}")
+    for result in results:
+        old = previous.get((result['name'], result['matches']))
+        if old is None:
+            continue
+        ratio = result['best_seconds'] / old['best_seconds'] if old['best_seconds'] else float('inf')
+        flag = '  REGRESSION' if ratio > 1 + threshold else ''
+        print(f"{result['name']:<32} {result['matches']:>7} {old['best_seconds']:>10.4f} "
+              f"{result['best_seconds']:>10.4f} {ratio:>7.2f}{flag}")
+        if flag:
+            regressions.append({**result, 'baseline_seconds': old['best_seconds'], 'ratio': round(ratio, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark MatchMetrics hot paths on synthetic corpora')
+    parser.add_argument('--sizes', '-s', type=int, nargs='+', default=DEFAULT_SIZES, help='Corpus sizes in matches')
+    parser.add_argument('--repeat', '-r', type=int, default=3, help='Timed repeats per benchmark')
+    parser.add_argument('--corpus-dir', type=str, help='Keep generated corpora here and reuse them between runs')
+    parser.add_argument('--output', '-o', type=str, default='bench_results.json', help='Where to write JSON results')
+    parser.add_argument('--baseline', '-b', type=str, help='Baseline JSON results to compare against')
+    parser.add_argument('--threshold', '-t', type=float, default=0.2,
+                        help='Allowed slowdown versus the baseline before failing (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    print(f"{'Benchmark':<32} {'Matches':>6} {'Best':>11} {'Peak':>13}")
+    if args.corpus_dir:
+        results = run(args.sizes, args.repeat, args.corpus_dir)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = run(args.sizes, args.repeat, tmp)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,22 @@
 import streamlit as st
 import pandas as pd
 import sys
+import threading
 sys.path.append('scripts')
 sys.path.append('visualizations')
-from scripts.load_and_parse import load_statsbomb_data, get_top_shot_takers, get_top_progressive_passers, get_player_comparison, get_team_performance_summary, get_position_heatmap_data
-from visualizations.shot_map_visualizer import create_shot_map
+from scripts.load_and_parse import publish_shared_dataset, get_dataset_version, find_events_files, load_expected_threat, load_freeze_frames, get_player_comparison, get_team_performance_summary
+from scripts.match_index import SAMPLE_COMPETITION, indexed_competitions, load_match_index
+from scripts.shared_dataset import attach_dataset, attach_match_tables, changed_matches, read_sources
+from scripts.aggregates import MetricTables
+from scripts.group_index import group_rows
+from scripts import instrumentation
+from scripts.instrumentation import stage
+from scripts.lru_cache import LRUCache
+from scripts.pass_network import NETWORK_WINDOWS, PassNetworks
+from scripts.player_search import PlayerSearchIndex, normalize_name
+from scripts.progressive_passes import progressive_pass_flags
+from visualizations.shot_map_visualizer import ShotMapRenderer, draw_pitch, scatter_shots, shot_legend
+from visualizations.pass_network_visualizer import MIN_NETWORK_PASSES, draw_pass_network
 
 st.set_page_config(page_title="MatchMetrics Explorer", page_icon="⚽", layout="wide", initial_sidebar_state="expanded")
 
@@ -98,53 +110,258 @@ with st.sidebar:
     )
     st.markdown("<div class='footer'>MatchMetrics Explorer</div>", unsafe_allow_html=True)
 
-@st.cache_data
-def load_cached_data():
-    df_shots, df_passes = load_statsbomb_data()
-    return df_shots, df_passes
+QUERY_CACHE_ENTRIES = 256
+PERFORMANCE_PANEL_ROWS = 50
+WATCH_INTERVAL_SECONDS = 60
+# Cached queries scoped to one team: the position of the team among their parameters
+TEAM_QUERIES = {'top_shot_takers': 0, 'progressive_passers': 2, 'team_summary': 0}
+ALL_COMPETITIONS = "All competitions"
+# Every competition filter is its own dataset version, so per-version resources keep one entry per scope in use
+SCOPE_CACHE_ENTRIES = 8
 
-@st.cache_data
-def get_cached_top_shot_takers(df_shots):
-    return get_top_shot_takers(df_shots)
+class LiveDataset:
+    """The server's current shared dataset, swapped for a new version when data/ changes.
 
-@st.cache_data
-def get_cached_top_progressive_passers(df_passes):
-    return get_top_progressive_passers(df_passes)
+    With a ``competition`` only that competition's match files are read and
+    published; the demo squads are only part of the unfiltered dataset.
+    """
+
+    def __init__(self, data_dir='data', competition=None):
+        self.data_dir = data_dir
+        self.filters = {'competition.name': competition} if competition else None
+        self.sample_data = competition is None
+        self._lock = threading.Lock()
+        self.current = self._publish()
+
+    def _publish(self):
+        # The frames are read-only maps of the shared dataset, so replicas on the same host share one copy
+        path = publish_shared_dataset(self.data_dir, sample_data=self.sample_data, filters=self.filters)
+        if path is None:
+            empty = pd.DataFrame()
+            version = get_dataset_version(self.data_dir, sample_data=self.sample_data, filters=self.filters)
+            return version, {}, empty, empty, None
+        df_shots, df_passes = attach_dataset(path)
+        tables = MetricTables(df_shots, df_passes, **attach_match_tables(path))
+        return path.name, read_sources(path), df_shots, df_passes, tables
+
+    def refresh(self):
+        """Ingest added, changed or removed match files; return the ids of the matches that changed"""
+        if get_dataset_version(self.data_dir, sample_data=self.sample_data, filters=self.filters) == self.current[0]:
+            return set()
+        with self._lock:
+            old = self.current
+            new = self._publish()
+            if new[0] == old[0]:
+                return set()
+            changed = changed_matches(old[1], new[1])
+            teams, players = set(), set()
+            match_tables = tuple(df for t in (old[4], new[4]) if t is not None
+                                 for df in (t.minutes, t.xg_chain) if df is not None)
+            for df in old[2:4] + new[2:4] + match_tables:
+                if not df.empty:
+                    rows = df[df['match_id'].isin(changed).to_numpy()]
+                    teams.update(rows['team.name'].dropna().astype(str))
+                    players.update(rows['player.name'].dropna().astype(str))
+            get_query_cache().rekey(lambda key: carry_over_query(key, old[0], new[0], teams, players))
+            get_shot_map_renderer().cache.rekey(
+                lambda key: (new[0],) + key[1:] if key[0] == old[0] and key[1] not in players else None
+            )
+            self.current = new
+            return changed
+
+def carry_over_query(key, old_version, new_version, teams, players):
+    """Re-key a cached result to ``new_version`` if none of the changed teams or players affect it"""
+    name, version, *params = key
+    if version != old_version:
+        return None
+    if name in TEAM_QUERIES:
+        team = params[TEAM_QUERIES[name]]
+        unaffected = team != "All" and team not in teams
+    elif name in ('player_comparison', 'player_shot_context'):
+        unaffected = not players.intersection(params)
+    else:
+        unaffected = False
+    return (name, new_version, *params) if unaffected else None
+
+@st.cache_resource
+def get_live_dataset(competition=None):
+    return LiveDataset(competition=competition)
+
+@st.cache_data(ttl=WATCH_INTERVAL_SECONDS)
+def competition_options(data_dir='data'):
+    # Competitions of the local matches index that have at least one events file
+    competitions = indexed_competitions(find_events_files(data_dir), load_match_index(data_dir))
+    return [ALL_COMPETITIONS] + list(dict.fromkeys(competitions['competition.name'].astype(str)))
+
+@st.cache_resource
+def get_query_cache():
+    return LRUCache(max_entries=QUERY_CACHE_ENTRIES)
+
+@st.cache_resource
+def get_shot_map_renderer():
+    return ShotMapRenderer()
+
+@st.cache_resource(max_entries=SCOPE_CACHE_ENTRIES)
+def get_freeze_frames(version):
+    # Memory-mapped, so every session shares the pages; a new dataset version maps the rebuilt arrays
+    return load_freeze_frames()
+
+@st.cache_resource(max_entries=SCOPE_CACHE_ENTRIES)
+def get_expected_threat(version, competition=None):
+    # The grid itself is cached on disk per dataset version; this keeps the player table in memory
+    return load_expected_threat(filters={'competition.name': competition} if competition else None)
+
+@st.cache_resource(max_entries=SCOPE_CACHE_ENTRIES)
+def get_pass_networks(version, _df_passes):
+    # Every (team, match, window) network of this dataset version, built in one vectorized pass
+    with stage('pass_networks', rows=len(_df_passes)):
+        return PassNetworks.build(_df_passes)
+
+def shot_map_png(df_shots, player_name, outcome='all'):
+    return get_shot_map_renderer().render(df_shots, player_name, outcome, version=st.session_state['dataset_version'])
+
+def cached_query(name, *params, compute):
+    """Memoize a section's result under (name, dataset version, *params) in the shared LRU cache"""
+    def timed_compute():
+        with stage(f'query:{name}'):
+            return compute()
+    return get_query_cache().get_or_compute((name, st.session_state['dataset_version']) + params, timed_compute)
+
+def performance_panel():
+    """Sidebar switch for stage timing and a table of the most recent stages.
+
+    Tracing set up by ``MATCHMETRICS_TRACE`` keeps its trace file and memory
+    settings, so the switch is locked on instead of resetting them.
+    """
+    if instrumentation.is_env_configured():
+        enabled = st.checkbox("Performance", value=True, disabled=True,
+                              help="Stage timing is turned on by MATCHMETRICS_TRACE for this server")
+    else:
+        enabled = st.checkbox("Performance", value=instrumentation.is_enabled(),
+                              help="Time loading, queries and page renders for every session of this server")
+        if enabled and not instrumentation.is_enabled():
+            instrumentation.enable()
+        elif not enabled and instrumentation.is_enabled():
+            instrumentation.disable()
+    if enabled:
+        recent = instrumentation.records()[-PERFORMANCE_PANEL_ROWS:][::-1]
+        if recent:
+            st.dataframe(pd.DataFrame(recent).drop(columns=['time']), hide_index=True)
+        else:
+            st.caption("No stages recorded yet; they appear from the next rerun.")
+
+@st.fragment(run_every=WATCH_INTERVAL_SECONDS)
+def watch_for_new_matches(version, competition=None):
+    """Poll data/ for new match files and rerun the page once a new dataset version is live"""
+    get_live_dataset(competition).refresh()
+    if get_live_dataset(competition).current[0] != version:
+        st.rerun()
+
+def compute_overview(df_shots, df_passes, tables):
+    return {
+        'teams': sorted(tables.tables['team'].index[tables.tables['team']['shots'] > 0].astype(str)),
+        'pass_teams': sorted(tables.tables['team'].index[tables.tables['team']['passes'] > 0].astype(str)),
+        'players': sorted(tables.tables['player'].index[tables.tables['player']['shots'] > 0].astype(str)),
+        'unique_players': df_shots['player.name'].nunique() + df_passes['player.name'].nunique(),
+        'competitions': compute_competitions(df_shots, df_passes),
+    }
+
+def compute_competitions(df_shots, df_passes):
+    """Matches per (competition, season) in the loaded events; matches missing from the index count as 'Other'"""
+    columns = ['match_id', 'competition.name', 'season.name']
+    matches = pd.concat([df[columns].astype(object) for df in (df_shots, df_passes) if not df.empty])
+    matches = matches.drop_duplicates('match_id').fillna({'competition.name': 'Other matches', 'season.name': ''})
+    counts = matches.groupby(['competition.name', 'season.name']).size().rename('matches')
+    return counts.sort_values(ascending=False, kind='stable').reset_index()
+
+def compute_top_shot_takers(tables, search_index, team, search_term, min_shots):
+    table = tables.tables['player'] if team == "All" else tables.team_players(team)
+    table = table[table['shots'] > 0]
+    if search_term:
+        table = table[table.index.isin(search_index.matches(search_term))]
+    top = table.sort_values('shots', ascending=False, kind='stable').head(10)
+    columns = ['shots', 'minutes', 'shots_per90'] if 'minutes' in top.columns else ['shots']
+    shot_counts = top[columns].rename(columns={'shots': 'shot_count'}).reset_index()
+    shot_counts = shot_counts[shot_counts['shot_count'] >= min_shots]
+    xg_stats = top[['shots', 'xg_mean']].rename(columns={'xg_mean': 'avg_xg'})
+    xg_stats = xg_stats[xg_stats['shots'] >= min_shots]
+    return shot_counts, xg_stats
+
+def compute_shot_context(df_shots, shot_context, player):
+    """Average freeze-frame context of a player's shots, or None if none of them has a freeze frame"""
+    ids = group_rows(df_shots, 'player', player)['id'].astype(str)
+    context = shot_context.reindex(ids)
+    if context['players_in_frame'].isna().all():
+        return None
+    return context.mean().to_dict()
+
+def compute_xt_leaders(players_xt, team):
+    table = players_xt if team == "All" else players_xt[players_xt.index.get_level_values(0) == team]
+    return table.head(10).reset_index()
+
+def compute_progressive_passers(df_passes, tables, method, threshold, team, min_passes):
+    if team == "All":
+        players = tables.table('player', threshold, method)
+        teams = tables.table('team', threshold, method)
+    else:
+        players = tables.team_players(team, threshold, method)
+        teams = tables.table('team', threshold, method).loc[[team]]
+    top_players = players['progressive_passes'].rename('progressive_pass_count').reset_index()
+    top_players = top_players.sort_values('progressive_pass_count', ascending=False, kind='stable')
+    top_players = top_players[top_players['progressive_pass_count'] >= min_passes].head(10)
+    top_teams = teams['progressive_passes'].rename('progressive_pass_count').reset_index()
+    top_teams = top_teams[top_teams['progressive_pass_count'] > 0]
+    top_teams = top_teams.sort_values('progressive_pass_count', ascending=False, kind='stable').head(10)
+    # Average distance needs the per-pass values, but only once per parameter set
+    is_progressive, forward_distance = progressive_pass_flags(df_passes, threshold, method)
+    if team != "All":
+        is_progressive = is_progressive & (df_passes['team.name'] == team).to_numpy()
+    avg_distance = float(forward_distance[is_progressive].mean()) if is_progressive.any() else None
+    return top_players, top_teams, avg_distance
 
 
 def main():
     st.title("⚽ MatchMetrics Explorer")
     st.markdown("Tactical Analysis Toolkit using StatsBomb Open Data")
-    df_shots, df_passes = load_cached_data()
+    with st.sidebar:
+        selected = st.selectbox("Competition:", competition_options(), key="competition",
+                                help="Only the selected competition's match files are read")
+    competition = None if selected == ALL_COMPETITIONS else selected
+    version, _, df_shots, df_passes, tables = get_live_dataset(competition).current
+    st.session_state['dataset_version'] = version
+    with st.sidebar:
+        if st.checkbox("Watch data/ for new matches", help=f"Checks for added or changed match files every {WATCH_INTERVAL_SECONDS}s"):
+            watch_for_new_matches(version, competition)
+        performance_panel()
     if df_shots.empty or df_passes.empty:
         st.error("No data found! Please ensure you have StatsBomb JSON files in the `data/` directory.")
         return
+    overview = cached_query('overview', compute=lambda: compute_overview(df_shots, df_passes, tables))
     
     # Competition/Data Source Information
     st.markdown("### 📊 Data Sources & Competitions")
+    competitions = overview['competitions']
+    open_data = competitions[competitions['competition.name'] != SAMPLE_COMPETITION]
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("""
-        **StatsBomb Open Data:**
-        - FIFA World Cup 2018 🏆
-        - FIFA Women's World Cup 2019 🏆
-        - UEFA Champions League matches ⚽
-        """)
+        lines = [f"- {' '.join(filter(None, (name, season)))} ({matches} matches)"
+                 for name, season, matches in open_data.itertuples(index=False)]
+        st.markdown("**StatsBomb Open Data:**\n" + "\n".join(lines))
     
-    with col2:
-        st.markdown("""
-        **Enhanced Sample Data:**
-        - Real Madrid (La Liga) 🇪🇸
-        - Manchester United (Premier League) 🏴󠁧󠁢󠁥󠁮󠁧󠁿
-        - Spain National Team 🇪🇸
-        """)
+    if len(open_data) < len(competitions):
+        with col2:
+            st.markdown("""
+            **Enhanced Sample Data:**
+            - Real Madrid (La Liga) 🇪🇸
+            - Manchester United (Premier League) 🏴󠁧󠁢󠁥󠁮󠁧󠁿
+            - Spain National Team 🇪🇸
+            """)
     
     # Display data overview
     unique_teams = df_shots['team.name'].nunique()
-    unique_competitions = ["World Cup 2018", "Women's World Cup 2019", "Champions League", "Sample Data"]
     
-    st.info(f"📈 **Current Dataset**: {unique_teams} teams across {len(unique_competitions)} competitions/sources")
+    st.info(f"📈 **Current Dataset**: {unique_teams} teams across {len(competitions)} competitions/sources")
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -154,7 +371,7 @@ def main():
     with col3:
         st.metric("Total Passes", len(df_passes))
     with col4:
-        st.metric("Unique Players", df_shots['player.name'].nunique() + df_passes['player.name'].nunique())
+        st.metric("Unique Players", overview['unique_players'])
     st.markdown("---")
 
     if section == "Top Shot-Takers":
@@ -164,7 +381,7 @@ def main():
         - Shots per 90 mins (not just raw count)
         - Optional: Include **xG per shot** for shot quality (if available)
         """)
-        teams = sorted(df_shots['team.name'].dropna().unique())
+        teams = overview['teams']
         # Add quick filter buttons for Real Madrid, Spain, Man United
         st.subheader("Quick Filters:")
         col1, col2, col3 = st.columns(3)
@@ -187,19 +404,17 @@ def main():
         
         # Player search
         st.subheader("Search Players:")
-        search_term = st.text_input("Search for a specific player:", placeholder="e.g., Benzema, Rashford...")
-        
-        filtered_shots = df_shots if selected_team == "All" else df_shots[df_shots['team.name'] == selected_team]
-        
-        # Apply search filter
-        if search_term:
-            filtered_shots = filtered_shots[filtered_shots['player.name'].str.contains(search_term, case=False, na=False)]
+        search_term = st.text_input("Search for a specific player:", placeholder="e.g., Benzema, Rashford, Mbappe...")
         
         # Minimum shots filter
         min_shots = st.slider("Minimum shots to display:", 1, 20, 1)
         
-        shot_counts = get_cached_top_shot_takers(filtered_shots)
-        shot_counts = shot_counts[shot_counts['shot_count'] >= min_shots]
+        search_key = normalize_name(search_term)
+        search_index = cached_query('player_search_index', compute=lambda: PlayerSearchIndex(tables.tables['player'].index))
+        shot_counts, xg_stats = cached_query(
+            'top_shot_takers', selected_team, search_key, min_shots,
+            compute=lambda: compute_top_shot_takers(tables, search_index, selected_team, search_key, min_shots)
+        )
         
         st.subheader(f"Top Shot Takers (minimum {min_shots} shots)")
         if not shot_counts.empty:
@@ -207,12 +422,7 @@ def main():
         else:
             st.info("No players found matching the criteria.")
         
-        if 'shot.statsbomb_xg' in filtered_shots.columns:
-            xg_stats = filtered_shots.groupby('player.name').agg(
-                shots=('id', 'count'),
-                avg_xg=('shot.statsbomb_xg', 'mean')
-            ).sort_values('shots', ascending=False).head(10)
-            xg_stats = xg_stats[xg_stats['shots'] >= min_shots]
+        if 'shot.statsbomb_xg' in df_shots.columns:
             st.subheader("xG per Shot (Top 10)")
             if not xg_stats.empty:
                 st.dataframe(xg_stats)
@@ -226,28 +436,25 @@ def main():
         """)
         
         # Enhanced filtering options
+        definition = st.radio("Progressive pass definition:", ["Forward distance", "Closer to goal (%)"], horizontal=True)
+        method = 'distance' if definition == "Forward distance" else 'goal_ratio'
         col1, col2 = st.columns(2)
         with col1:
-            threshold = st.slider("Minimum forward distance for progressive pass (meters):", 5, 30, 10)
+            if method == 'distance':
+                threshold = st.slider("Minimum forward distance for progressive pass (meters):", 5, 30, 10)
+            else:
+                threshold = st.slider("Minimum reduction in distance to goal (%):", 10, 50, 25)
         with col2:
             min_passes = st.slider("Minimum progressive passes to display:", 1, 50, 5)
         
         # Team filter for progressive passes
-        teams = sorted(df_passes['team.name'].dropna().unique())
+        teams = overview['pass_teams']
         selected_team_passes = st.selectbox("Filter by team:", ["All"] + teams, key="prog_team_filter")
         
-        filtered_passes = df_passes if selected_team_passes == "All" else df_passes[df_passes['team.name'] == selected_team_passes]
-        
-        progressive_passes = filtered_passes.copy()
-        progressive_passes['start_x'] = progressive_passes['location'].apply(lambda x: x[0] if isinstance(x, (list, tuple)) and len(x) >= 2 else None)
-        progressive_passes['end_x'] = progressive_passes['pass.end_location'].apply(lambda x: x[0] if isinstance(x, (list, tuple)) and len(x) >= 2 else None)
-        progressive_passes['forward_distance'] = progressive_passes['end_x'] - progressive_passes['start_x']
-        progressive_passes = progressive_passes[(progressive_passes['forward_distance'] > threshold) & (progressive_passes['forward_distance'].notna())]
-        
-        top_players = progressive_passes.groupby('player.name').size().reset_index(name='progressive_pass_count').sort_values('progressive_pass_count', ascending=False)
-        top_players = top_players[top_players['progressive_pass_count'] >= min_passes].head(10)
-        
-        top_teams = progressive_passes.groupby('team.name').size().reset_index(name='progressive_pass_count').sort_values('progressive_pass_count', ascending=False).head(10)
+        top_players, top_teams, avg_distance = cached_query(
+            'progressive_passers', method, threshold, selected_team_passes, min_passes,
+            compute=lambda: compute_progressive_passers(df_passes, tables, method, threshold, selected_team_passes, min_passes)
+        )
         
         st.subheader(f"Top 10 Progressive Passers (Players) - Min {min_passes} passes")
         if not top_players.empty:
@@ -259,19 +466,26 @@ def main():
         st.dataframe(top_teams)
         
         # Show average progressive pass distance
-        if not progressive_passes.empty:
-            avg_distance = progressive_passes['forward_distance'].mean()
+        if avg_distance is not None:
             st.metric("Average Progressive Pass Distance", f"{avg_distance:.1f} meters")
+
+        st.subheader("Top 10 Ball Progressors by Expected Threat (xT) Added")
+        st.caption("xT added by successful passes and carries, from a grid fitted on every match's passes, carries and shots")
+        _, players_xt = get_expected_threat(version, competition)
+        xt_leaders = cached_query('xt_leaders', selected_team_passes,
+                                  compute=lambda: compute_xt_leaders(players_xt, selected_team_passes))
+        if not xt_leaders.empty:
+            st.dataframe(xt_leaders)
     elif section == "Shot Maps":
         st.header("🗺️ Shot Maps")
         st.markdown("Select a player to view their shot map and stats.")
-        players = sorted(df_shots['player.name'].unique())
+        players = overview['players']
         selected_player = st.selectbox("Select a player:", players)
         if selected_player:
-            player_shots = df_shots[df_shots['player.name'] == selected_player]
-            total_shots = len(player_shots)
-            goals = len(player_shots[player_shots['shot.outcome.name'] == 'Goal'])
-            conversion_rate = (goals / total_shots * 100) if total_shots > 0 else 0
+            player_stats = tables.lookup('player', selected_player)
+            total_shots = player_stats['shots']
+            goals = player_stats['goals']
+            conversion_rate = player_stats['conversion_rate']
             col1, col2, col3, col4 = st.columns(4)
             with col1:
                 st.metric("Total Shots", total_shots)
@@ -280,16 +494,30 @@ def main():
             with col3:
                 st.metric("Conversion Rate", f"{conversion_rate:.1f}%")
             with col4:
-                st.metric("Team", player_shots['team.name'].iloc[0] if not player_shots.empty else "N/A")
+                st.metric("Team", tables.player_team.get(selected_player, "N/A"))
             st.subheader(f"Shot Map: {selected_player}")
-            fig = create_shot_map(df_shots, selected_player)
-            if fig:
-                st.pyplot(fig)
+            shown = st.radio("Show:", ["All shots", "Goals", "Other shots"], horizontal=True)
+            outcome = {"All shots": 'all', "Goals": 'goals', "Other shots": 'other'}[shown]
+            png = shot_map_png(df_shots, selected_player, outcome)
+            if png:
+                st.image(png)
+            shot_context = cached_query('shot_context', compute=lambda: get_freeze_frames(version).shot_context())
+            context = cached_query('player_shot_context', selected_player,
+                                   compute=lambda: compute_shot_context(df_shots, shot_context, selected_player))
+            if context is not None:
+                st.subheader("Shot Context (freeze frames)")
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Avg defenders between ball and goal", f"{context['defenders_in_cone']:.1f}")
+                with col2:
+                    st.metric("Avg goalkeeper distance", f"{context['goalkeeper_distance']:.1f}")
+                with col3:
+                    st.metric("Avg nearest opponent distance", f"{context['nearest_opponent_distance']:.1f}")
     elif section == "Player Comparison":
         st.header("🆚 Player Comparison")
         st.markdown("Compare two players across key performance metrics.")
         
-        players = sorted(df_shots['player.name'].unique())
+        players = overview['players']
         col1, col2 = st.columns(2)
         
         with col1:
@@ -298,7 +526,10 @@ def main():
             player2 = st.selectbox("Select second player:", players, key="player2", index=1 if len(players) > 1 else 0)
         
         if player1 and player2 and player1 != player2:
-            comparison_df = get_player_comparison(df_shots, df_passes, player1, player2)
+            comparison_df = cached_query(
+                'player_comparison', player1, player2,
+                compute=lambda: get_player_comparison(df_shots, df_passes, player1, player2, tables=tables)
+            )
             st.subheader("Performance Comparison")
             st.dataframe(comparison_df)
             
@@ -308,15 +539,15 @@ def main():
             
             with col1:
                 st.markdown(f"**{player1} - Shot Map**")
-                fig1 = create_shot_map(df_shots, player1)
-                if fig1:
-                    st.pyplot(fig1)
+                png1 = shot_map_png(df_shots, player1)
+                if png1:
+                    st.image(png1)
             
             with col2:
                 st.markdown(f"**{player2} - Shot Map**")
-                fig2 = create_shot_map(df_shots, player2)
-                if fig2:
-                    st.pyplot(fig2)
+                png2 = shot_map_png(df_shots, player2)
+                if png2:
+                    st.image(png2)
         else:
             st.info("Please select two different players to compare.")
     
@@ -324,11 +555,14 @@ def main():
         st.header("🏆 Team Analysis")
         st.markdown("Comprehensive team performance analysis.")
         
-        teams = sorted(df_shots['team.name'].dropna().unique())
+        teams = overview['teams']
         selected_team = st.selectbox("Select a team:", teams)
         
         if selected_team:
-            team_stats = get_team_performance_summary(df_shots, df_passes, selected_team)
+            team_stats = cached_query(
+                'team_summary', selected_team,
+                compute=lambda: get_team_performance_summary(df_shots, df_passes, selected_team, tables=tables)
+            )
             
             # Team overview metrics
             st.subheader(f"{selected_team} - Overview")
@@ -367,45 +601,46 @@ def main():
                     top_shooters_df.columns = ['Player', 'Shots']
                     st.dataframe(top_shooters_df)
             
+            # Passing network of one match
+            st.subheader(f"{selected_team} - Passing Network")
+            networks = get_pass_networks(version, df_passes)
+            network_matches = networks.matches(selected_team)
+            if network_matches:
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    match_id = st.selectbox("Match:", network_matches, key="network-match")
+                with col2:
+                    window = st.selectbox("Period:", list(NETWORK_WINDOWS), key="network-window")
+                with col3:
+                    min_passes = st.slider("Minimum passes per link:", 1, 15, MIN_NETWORK_PASSES,
+                                           key="network-min-passes")
+                nodes, edges = networks.network(selected_team, match_id, window)
+                if nodes.empty:
+                    st.info("No completed passes for this team in the selected period.")
+                else:
+                    st.pyplot(draw_pass_network(nodes, edges, f"{selected_team} - Match {match_id} ({window})",
+                                                min_passes))
+            else:
+                st.info("No completed passes with a recipient for this team.")
+            
             # Team shot map (all players)
             st.subheader(f"{selected_team} - All Shots")
-            team_shots = df_shots[df_shots['team.name'] == selected_team]
+            team_shots = group_rows(df_shots, 'team', selected_team)
             if not team_shots.empty:
                 # Create a combined shot map for the team
-                import matplotlib.pyplot as plt
-                from mplsoccer import Pitch
-                
-                # Extract shot positions for all team players
-                shot_positions = []
-                for _, shot in team_shots.iterrows():
-                    if isinstance(shot['location'], (list, tuple)) and len(shot['location']) >= 2:
-                        shot_positions.append({
-                            'x': shot['location'][0],
-                            'y': shot['location'][1],
-                            'outcome': shot['shot.outcome.name']
-                        })
-                
-                if shot_positions:
-                    pitch = Pitch(pitch_type='statsbomb', pitch_color='grass', line_color='white')
-                    fig, ax = pitch.draw(figsize=(12, 8))
+                if team_shots[['location_x', 'location_y']].notna().all(axis=1).any():
+                    pitch, fig, ax = draw_pitch()
                     
-                    for shot in shot_positions:
-                        color = 'red' if shot['outcome'] == 'Goal' else 'blue'
-                        pitch.scatter(shot['x'], shot['y'], c=color, s=60, alpha=0.7, ax=ax)
+                    total = scatter_shots(pitch, ax, team_shots, s=60)
                     
-                    ax.set_title(f"{selected_team} - All Shots\nTotal: {len(shot_positions)} shots", 
+                    ax.set_title(f"{selected_team} - All Shots\nTotal: {total} shots", 
                                fontsize=16, fontweight='bold', pad=20)
-                    
-                    from matplotlib.patches import Patch
-                    legend_elements = [
-                        Patch(facecolor='red', alpha=0.7, label='Goals'),
-                        Patch(facecolor='blue', alpha=0.7, label='Other Shots')
-                    ]
-                    ax.legend(handles=legend_elements, loc='upper right')
+                    shot_legend(ax)
                     
                     st.pyplot(fig)
                 else:
                     st.info("No valid shot positions found for this team.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    with stage(f'render:{section}'):
+        main() 
\ No newline at end of file
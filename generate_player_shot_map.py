@@ -1,71 +1,128 @@
 #!/usr/bin/env python3
 """
 Comprehensive script to generate shot maps for any player using StatsBomb data.
+
+Plotting and data-loading modules are imported only when a map is drawn or the
+events are loaded; --list-players and --stats are answered from the player
+summary file (scripts/player_summary.py) while the match files are unchanged.
 """
 
+import time
+STARTED = time.perf_counter()
+
 import sys
 import os
+import re
+import json
+import hashlib
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 sys.path.append('scripts')
 sys.path.append('visualizations')
 
-from scripts.load_and_parse import load_statsbomb_data
-from visualizations.shot_map_visualizer import create_shot_map
-import pandas as pd
+# Light on purpose: heavy modules are imported inside the functions that need them
+from scripts import instrumentation
+from scripts.player_summary import read_player_summary, summary_rows, write_player_summary
 
-def list_available_players(df_shots):
-    """List all available players with their shot counts."""
-    if df_shots.empty:
-        print("No shot data available.")
-        return
-    
-    player_stats = df_shots.groupby('player.name').agg({
-        'id': 'count',
-        'shot.outcome.name': lambda x: (x == 'Goal').sum()
-    }).rename(columns={'id': 'total_shots', 'shot.outcome.name': 'goals'})
-    
-    player_stats['conversion_rate'] = (player_stats['goals'] / player_stats['total_shots'] * 100).round(1)
-    player_stats = player_stats.sort_values('total_shots', ascending=False)
+BATCH_MANIFEST = 'manifest.json'
+FINGERPRINT_COLUMNS = ['location_x', 'location_y', 'shot.outcome.name']
+
+class PhaseTimer:
+    """Wall-clock time of each CLI phase, measured from script start"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = []
+        self._last = STARTED
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self):
+        if not self.enabled:
+            return
+        print("\n⏱️  Timings:")
+        for phase, seconds in self.phases:
+            print(f"   {phase:<14} {seconds:>8.3f}s")
+        print(f"   {'total':<14} {time.perf_counter() - STARTED:>8.3f}s")
+        stages = instrumentation.records()
+        if stages:
+            print("   stages:")
+            for record in stages:
+                rows = f"  {record['rows']} rows" if record['rows'] is not None else ''
+                print(f"     {record['stage']:<20} {record['seconds']:>8.3f}s{rows}")
+
+def print_player_table(rows):
+    """Print the 20 players with the most shots from player summary rows"""
+    rows = sorted((row for row in rows if row['shots'] > 0), key=lambda row: row['shots'], reverse=True)
     
-    print(f"\n📊 Available Players ({len(player_stats)} total):")
+    print(f"\n📊 Available Players ({len(rows)} total):")
     print("=" * 80)
     print(f"{'Rank':<4} {'Player Name':<30} {'Shots':<6} {'Goals':<6} {'Conv%':<6}")
     print("-" * 80)
     
-    for i, (player, stats) in enumerate(player_stats.head(20).iterrows(), 1):
-        print(f"{i:<4} {player:<30} {stats['total_shots']:<6} {stats['goals']:<6} {stats['conversion_rate']:<6.1f}")
+    for i, row in enumerate(rows[:20], 1):
+        print(f"{i:<4} {row['player']:<30} {row['shots']:<6} {row['goals']:<6} {row['conversion_rate']:<6.1f}")
     
-    if len(player_stats) > 20:
-        print(f"... and {len(player_stats) - 20} more players")
+    if len(rows) > 20:
+        print(f"... and {len(rows) - 20} more players")
+
+def print_player_stats(row):
+    print(f"📊 Player Statistics:")
+    print(f"   Total shots: {row['shots']}")
+    print(f"   Goals: {row['goals']}")
+    print(f"   Conversion rate: {row['conversion_rate']:.1f}%")
+    print(f"   Team: {row['team'] or 'N/A'}")
 
-def generate_shot_map_for_player(df_shots, player_name, save_path=None):
+def list_available_players(df_shots, tables=None):
+    """List all available players with their shot counts."""
+    if df_shots.empty:
+        print("No shot data available.")
+        return
+    
+    from scripts.aggregates import get_metric_tables
+    tables = tables if tables is not None else get_metric_tables(df_shots, df_shots.iloc[:0])
+    print_player_table(summary_rows(tables))
+
+def answer_from_summary(args, rows):
+    """Handle --list-players and --stats from player summary rows"""
+    if args.list_players:
+        print_player_table(rows)
+        return
+    row = next((row for row in rows if row['player'] == args.player), None)
+    if row is None:
+        print(f"❌ Player '{args.player}' not found in the data.")
+        print("Use --list-players to see available players.")
+        return
+    print_player_stats(row)
+
+def generate_shot_map_for_player(df_shots, player_name, save_path=None, tables=None, dpi=300):
     """Generate shot map for a specific player."""
     print(f"\n🎯 Generating shot map for: {player_name}")
     
+    from scripts.aggregates import get_metric_tables
+    tables = tables if tables is not None else get_metric_tables(df_shots, df_shots.iloc[:0])
+    
     # Check if player exists
-    if player_name not in df_shots['player.name'].values:
+    if player_name not in tables.player_team.index:
         print(f"❌ Player '{player_name}' not found in the data.")
         print("Use --list-players to see available players.")
         return False
     
     # Get player stats
-    player_shots = df_shots[df_shots['player.name'] == player_name]
-    total_shots = len(player_shots)
-    goals = len(player_shots[player_shots['shot.outcome.name'] == 'Goal'])
-    conversion_rate = (goals / total_shots * 100) if total_shots > 0 else 0
-    
-    print(f"📊 Player Statistics:")
-    print(f"   Total shots: {total_shots}")
-    print(f"   Goals: {goals}")
-    print(f"   Conversion rate: {conversion_rate:.1f}%")
-    print(f"   Team: {player_shots['team.name'].iloc[0] if not player_shots.empty else 'N/A'}")
+    player_stats = tables.lookup('player', player_name)
+    print_player_stats({**player_stats, 'team': tables.player_team.get(player_name, '')})
     
-    if total_shots == 0:
+    if player_stats['shots'] == 0:
         print("❌ No shots found for this player.")
         return False
     
     # Generate shot map
-    fig = create_shot_map(df_shots, player_name, save_path=save_path)
+    from visualizations.shot_map_visualizer import create_shot_map
+    fig = create_shot_map(df_shots, player_name, save_path=save_path, dpi=dpi)
     
     if fig:
         print(f"✅ Shot map generated successfully!")
@@ -76,34 +133,234 @@ def generate_shot_map_for_player(df_shots, player_name, save_path=None):
         print("❌ Failed to generate shot map.")
         return False
 
+def slugify(name):
+    return re.sub(r'[^\w.-]+', '_', str(name)).strip('_') or 'unknown'
+
+def read_players_file(path):
+    """Player names from a text file, one per line; blank lines and # comments are ignored"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+def select_players(tables, all_players=False, team=None, players_file=None):
+    """Players with at least one shot matching the batch options, plus requested names that were not found"""
+    players = tables.tables['player']
+    shooters = set(players.index[players['shots'] > 0])
+    selected = []
+    if all_players:
+        selected += sorted(shooters)
+    if team:
+        team_table = tables.team_players(team)
+        selected += sorted(team_table.index[team_table['shots'] > 0])
+    missing = []
+    if players_file:
+        for name in read_players_file(players_file):
+            (selected if name in shooters else missing).append(name)
+    return list(dict.fromkeys(selected)), missing
+
+def shot_map_fingerprint(player_shots, dpi):
+    """Hash of everything a player's map is drawn from, used to skip unchanged maps"""
+    import pandas as pd
+    digest = hashlib.sha1(f'dpi={dpi}'.encode())
+    digest.update(pd.util.hash_pandas_object(player_shots[FINGERPRINT_COLUMNS].astype(object), index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+_worker_renderer = None
+_worker_shots = None
+
+def _attach_render_worker(shared_path):
+    from scripts.shared_dataset import attach_dataset
+    global _worker_shots
+    _worker_shots, _ = attach_dataset(shared_path)
+
+def _render_map_job(job):
+    """Render one map in a worker; the pitch template is reused for every job the process runs"""
+    from scripts.group_index import group_rows
+    from visualizations.shot_map_visualizer import ShotMapRenderer
+    global _worker_renderer
+    player_name, player_shots, path, dpi = job
+    if player_shots is None:
+        player_shots = group_rows(_worker_shots, 'player', player_name)
+    if _worker_renderer is None:
+        # Nothing is kept in the PNG cache: every batch map is rendered exactly once
+        _worker_renderer = ShotMapRenderer(max_bytes=0)
+    start = time.perf_counter()
+    png = _worker_renderer.render(player_shots, player_name, dpi=dpi)
+    if png is not None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(png)
+    return png is not None, time.perf_counter() - start
+
+def generate_shot_maps_batch(df_shots, players, output_dir, tables, jobs=1, dpi=300, force=False, shared_path=None):
+    """Render ``players``' shot maps into ``output_dir/<team>/<player>.png``.
+
+    Maps whose shots and settings match the previous run's manifest are skipped
+    unless ``force`` is set. With ``shared_path`` (see ``publish_shared_dataset``)
+    pool workers attach to the shared dataset rather than being sent each
+    player's shots. Returns the per-map results.
+    """
+    from scripts.group_index import group_rows
+    output_dir = Path(output_dir)
+    manifest_path = output_dir / BATCH_MANIFEST
+    previous = {}
+    if manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f).get('maps', {})
+
+    results, jobs_to_run = {}, []
+    for player_name in players:
+        player_shots = group_rows(df_shots, 'player', player_name)
+        relative = f"{slugify(tables.player_team.get(player_name, 'unknown'))}/{slugify(player_name)}.png"
+        fingerprint = shot_map_fingerprint(player_shots, dpi)
+        entry = {'player': player_name, 'fingerprint': fingerprint, 'seconds': 0.0}
+        old = previous.get(relative)
+        if not force and old and old.get('fingerprint') == fingerprint and (output_dir / relative).exists():
+            results[relative] = {**entry, 'status': 'skipped'}
+        else:
+            results[relative] = {**entry, 'status': 'pending'}
+            jobs_to_run.append((relative, (player_name, player_shots, output_dir / relative, dpi)))
+
+    print(f"Rendering {len(jobs_to_run)} of {len(players)} shot maps ({len(players) - len(jobs_to_run)} unchanged)")
+    job_args = [job for _, job in jobs_to_run]
+    if jobs > 1 and len(job_args) > 1:
+        pool_options = {}
+        if shared_path is not None:
+            job_args = [(player_name, None, path, dpi) for player_name, _, path, dpi in job_args]
+            pool_options = {'initializer': _attach_render_worker, 'initargs': (shared_path,)}
+        with ProcessPoolExecutor(max_workers=jobs, **pool_options) as executor:
+            outcomes = list(executor.map(_render_map_job, job_args))
+    else:
+        outcomes = [_render_map_job(job) for job in job_args]
+    for (relative, _), (rendered, seconds) in zip(jobs_to_run, outcomes):
+        results[relative].update(status='rendered' if rendered else 'no shots', seconds=round(seconds, 4))
+        print(f"   {results[relative]['status']:<9} {seconds:>7.2f}s  {relative}")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    maps = dict(previous)
+    for relative, result in results.items():
+        if result['status'] == 'rendered':
+            maps[relative] = {k: result[k] for k in ('player', 'fingerprint', 'seconds')}
+    tmp_path = manifest_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'maps': maps}, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+    return results
+
+def print_batch_summary(results, missing, elapsed):
+    counts = {}
+    for result in results.values():
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    render_seconds = sum(r['seconds'] for r in results.values())
+    print(f"\n📊 Batch summary ({elapsed:.1f}s wall, {render_seconds:.1f}s rendering):")
+    for status in ('rendered', 'skipped', 'no shots'):
+        print(f"   {status:<9} {counts.get(status, 0)}")
+    if missing:
+        print(f"   not found {len(missing)}: {', '.join(missing)}")
+
 def main():
+    timer = PhaseTimer()
     parser = argparse.ArgumentParser(description='Generate shot maps for football players using StatsBomb data')
     parser.add_argument('--player', '-p', type=str, help='Player name to generate shot map for')
     parser.add_argument('--list-players', '-l', action='store_true', help='List all available players')
+    parser.add_argument('--stats', action='store_true', help="Only print --player's statistics, without drawing a map")
     parser.add_argument('--output', '-o', type=str, default='visualizations/shot_map.png', 
                        help='Output file path for the shot map')
     parser.add_argument('--data-dir', '-d', type=str, default='data', help='Directory containing StatsBomb JSON files')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='Number of worker processes used to parse match files')
+    parser.add_argument('--sample-data', action='store_true', help='Include the seeded Real Madrid / Manchester United / Spain demo squads')
+    parser.add_argument('--competition', type=str, help="Only read matches of this competition (needs a local matches index)")
+    parser.add_argument('--season', type=str, help="Only read matches of this season, e.g. '2018' (needs a local matches index)")
+    parser.add_argument('--match', type=int, action='append', help='Only read this match id; repeat for several matches')
+    parser.add_argument('--all-players', action='store_true', help='Batch mode: render a map for every player with a shot')
+    parser.add_argument('--team', '-t', type=str, help="Batch mode: render maps for every player of this team")
+    parser.add_argument('--players-file', type=str, help='Batch mode: render maps for the players listed in this file, one per line')
+    parser.add_argument('--output-dir', type=str, default='visualizations/shot_maps',
+                       help='Batch mode output directory; maps are written as <team>/<player>.png')
+    parser.add_argument('--dpi', type=int, default=300, help='Resolution of saved shot maps')
+    parser.add_argument('--force', action='store_true', help='Batch mode: re-render maps even if their inputs are unchanged')
+    parser.add_argument('--timings', action='store_true', help='Report startup, per-phase and per-stage wall-clock time')
+    parser.add_argument('--trace', type=str, help='Append a JSON line per timed loader stage to this file')
     
     args = parser.parse_args()
+    timer.enabled = args.timings
+    if args.timings or args.trace:
+        instrumentation.enable(args.trace)
+    timer.mark('startup')
+    try:
+        run(args, timer)
+    finally:
+        timer.report()
+
+def match_filters(args):
+    """Loader filters for --competition, --season and --match, or None to read every match file"""
+    filters = {'competition.name': args.competition, 'season.name': args.season, 'match_id': args.match}
+    return {col: value for col, value in filters.items() if value} or None
+
+def run(args, timer):
+    filters = match_filters(args)
+    # The player summary covers every match file, so filtered queries always load
+    if not filters and (args.list_players or (args.player and args.stats)):
+        rows = read_player_summary(args.data_dir, args.sample_data)
+        timer.mark('read summary')
+        if rows is not None:
+            answer_from_summary(args, rows)
+            return
+        print("Player summary is missing or out of date; loading match data...")
+    
+    import pandas as pd
+    from scripts.aggregates import get_metric_tables
+    from scripts.load_and_parse import load_statsbomb_data, publish_shared_dataset
+    from scripts.shared_dataset import attach_dataset
+    timer.mark('imports')
     
+    batch = bool(args.all_players or args.team or args.players_file)
+    shared_path = None
     print("Loading StatsBomb data...")
-    df_shots, df_passes = load_statsbomb_data(args.data_dir)
+    if batch and args.jobs > 1:
+        # Render workers map the published dataset instead of receiving pickled frames
+        shared_path = publish_shared_dataset(args.data_dir, args.sample_data, args.jobs, filters=filters)
+        df_shots, df_passes = attach_dataset(shared_path) if shared_path else (pd.DataFrame(), pd.DataFrame())
+    else:
+        df_shots, df_passes = load_statsbomb_data(args.data_dir, workers=args.jobs, sample_data=args.sample_data,
+                                                  filters=filters)
     
     if df_shots.empty:
         print("❌ No shot data found. Please ensure you have StatsBomb JSON files in the data/ directory.")
         return
     
     print(f"✅ Loaded {len(df_shots)} shots and {len(df_passes)} passes")
-    
-    # Ensure output directory exists
-    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    timer.mark('load')
+    tables = get_metric_tables(df_shots, df_passes)
+    if not filters:
+        write_player_summary(tables, args.data_dir, args.sample_data)
+    timer.mark('metrics')
     
     if args.list_players:
-        list_available_players(df_shots)
+        list_available_players(df_shots, tables)
         return
     
+    if args.player and args.stats:
+        if args.player in tables.player_team.index:
+            print_player_stats({**tables.lookup('player', args.player), 'team': tables.player_team.get(args.player, '')})
+        else:
+            print(f"❌ Player '{args.player}' not found in the data.")
+        return
+    
+    if batch:
+        start = time.perf_counter()
+        players, missing = select_players(tables, args.all_players, args.team, args.players_file)
+        results = generate_shot_maps_batch(df_shots, players, args.output_dir, tables,
+                                           jobs=args.jobs, dpi=args.dpi, force=args.force, shared_path=shared_path)
+        timer.mark('render')
+        print_batch_summary(results, missing, time.perf_counter() - start)
+        return
+    
+    # Ensure output directory exists
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    
     if args.player:
-        success = generate_shot_map_for_player(df_shots, args.player, args.output)
+        success = generate_shot_map_for_player(df_shots, args.player, args.output, tables, args.dpi)
+        timer.mark('render')
         if success:
             print(f"\n🎉 Shot map for {args.player} has been generated!")
         else:
@@ -113,6 +370,9 @@ def main():
         print("  python generate_player_shot_map.py --list-players")
         print("  python generate_player_shot_map.py --player 'Antoine Griezmann'")
         print("  python generate_player_shot_map.py --player 'Eden Hazard' --output 'hazard_shot_map.png'")
+        print("  python generate_player_shot_map.py --player 'Eden Hazard' --stats --timings")
+        print("  python generate_player_shot_map.py --team 'France' --jobs 4 --output-dir reports/shot_maps")
+        print("  python generate_player_shot_map.py --list-players --competition 'FIFA World Cup' --season 2018")
         print("\nUse --help for more options.")
 
 if __name__ == "__main__":
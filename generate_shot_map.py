@@ -14,7 +14,7 @@ import pandas as pd
 
 def main():
     print("Loading StatsBomb data...")
-    df_shots, df_passes = load_statsbomb_data('data')
+    df_shots, df_passes = load_statsbomb_data('data', sample_data=True)
     
     if df_shots.empty:
         print("No shot data found. Please ensure you have StatsBomb JSON files in the data/ directory.")
@@ -0,0 +1,151 @@
+"""Per-player and per-team summary tables built once after loading.
+
+``MetricTables`` precomputes shots, goals, xG, passes and progressive passes
+for every player, every team and every (team, player) pair so that
+comparisons and team summaries become ``.loc`` lookups instead of boolean-mask
+scans over the event frames. Progressive-pass columns depend on the chosen
+threshold and definition; they are computed per (method, threshold) on
+demand and cached separately so the rest of the tables never rebuild.
+
+Given the per-match minutes-played (``scripts/minutes_played.py``) and
+xGChain (``scripts/possession_chains.py``) tables, the player and
+(team, player) tables also carry minutes, xGChain, xGBuildup and per-90 rates.
+"""
+
+import numpy as np
+import pandas as pd
+
+from scripts.frame_cache import frame_cache
+from scripts.instrumentation import timed
+from scripts.progressive_passes import DEFAULT_THRESHOLD, progressive_pass_flags
+
+LEVELS = {
+    'player': ['player.name'],
+    'team': ['team.name'],
+    'team_player': ['team.name', 'player.name'],
+}
+
+
+def _group(values, df, keys):
+    return values.groupby([df[k] for k in keys], observed=True)
+
+
+def _summary(df_shots, df_passes, keys):
+    """Shots, goals, xG and passes per group, indexed by ``keys``"""
+    is_goal = (df_shots['shot.outcome.name'] == 'Goal').astype(int)
+    xg = df_shots['shot.statsbomb_xg'] if 'shot.statsbomb_xg' in df_shots.columns else pd.Series(np.nan, index=df_shots.index)
+    table = pd.DataFrame({
+        'shots': _group(is_goal, df_shots, keys).size(),
+        'goals': _group(is_goal, df_shots, keys).sum(),
+        'xg_sum': _group(xg, df_shots, keys).sum(),
+        'xg_mean': _group(xg, df_shots, keys).mean(),
+    })
+    passes = _group(df_passes['team.name'], df_passes, keys).size().rename('passes')
+    table = table.join(passes, how='outer')
+    table[['shots', 'goals', 'passes']] = table[['shots', 'goals', 'passes']].fillna(0).astype(int)
+    table['xg_sum'] = table['xg_sum'].fillna(0.0)
+    table['conversion_rate'] = np.where(table['shots'] > 0, table['goals'] / table['shots'].clip(lower=1) * 100, 0.0)
+    return table.sort_index()
+
+
+def per90(values, minutes):
+    """``values`` per 90 minutes played; NaN where no minutes are recorded"""
+    minutes = np.asarray(minutes, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(minutes > 0, np.asarray(values, dtype=float) / minutes * 90, np.nan)
+
+
+def _group_totals(frame, columns, keys, index):
+    """Sums of ``columns`` of a per-match table for every group of a summary ``index``"""
+    totals = frame.groupby([frame[k].astype(object) for k in keys])[columns].sum()
+    # Names are categorical with different categories in each frame, so align on plain values
+    labels = index.to_frame(index=False).astype(object)
+    labels = pd.MultiIndex.from_frame(labels) if len(keys) > 1 else pd.Index(labels[keys[0]])
+    return totals.reindex(labels, fill_value=0.0).to_numpy()
+
+
+def _add_minutes(table, minutes, keys):
+    """Join total minutes per group onto ``table`` and add shot and xG rates per 90"""
+    table['minutes'] = _group_totals(minutes, ['minutes'], keys, table.index)[:, 0]
+    table['shots_per90'] = per90(table['shots'], table['minutes'])
+    table['xg_per90'] = per90(table['xg_sum'], table['minutes'])
+    return table
+
+
+def _add_xg_chain(table, xg_chain, keys):
+    """Join xGChain and xGBuildup per group onto ``table``, per 90 too when minutes are known"""
+    table[['xg_chain', 'xg_buildup']] = _group_totals(xg_chain, ['xg_chain', 'xg_buildup'], keys, table.index)
+    if 'minutes' in table.columns:
+        table['xg_chain_per90'] = per90(table['xg_chain'], table['minutes'])
+        table['xg_buildup_per90'] = per90(table['xg_buildup'], table['minutes'])
+    return table
+
+
+class MetricTables:
+    """Summary tables indexed by player, team and (team, player)"""
+
+    @timed('metric_tables')
+    def __init__(self, df_shots, df_passes, minutes=None, xg_chain=None):
+        self.df_passes = df_passes
+        self.minutes = minutes
+        self.xg_chain = xg_chain
+        self.tables = {level: _summary(df_shots, df_passes, keys) for level, keys in LEVELS.items()}
+        for level in ('player', 'team_player'):
+            if minutes is not None:
+                self.tables[level] = _add_minutes(self.tables[level], minutes, LEVELS[level])
+            if xg_chain is not None:
+                self.tables[level] = _add_xg_chain(self.tables[level], xg_chain, LEVELS[level])
+        # A player's team is the team of their first shot, falling back to their first pass
+        shot_team = df_shots.groupby('player.name', observed=True)['team.name'].first()
+        pass_team = df_passes.groupby('player.name', observed=True)['team.name'].first()
+        self.player_team = shot_team.astype(object).combine_first(pass_team.astype(object))
+        self._progressive = {}
+
+    def progressive_column(self, level, threshold=DEFAULT_THRESHOLD, method='distance'):
+        """Progressive-pass counts for ``level``, computed once per (method, threshold)"""
+        key = (level, method, threshold)
+        column = self._progressive.get(key)
+        if column is None:
+            flags, _ = progressive_pass_flags(self.df_passes, threshold, method)
+            counts = _group(pd.Series(flags, index=self.df_passes.index), self.df_passes, LEVELS[level]).sum()
+            column = counts.reindex(self.tables[level].index, fill_value=0).astype(int)
+            self._progressive[key] = column
+        return column
+
+    def table(self, level, threshold=DEFAULT_THRESHOLD, method='distance'):
+        """Full summary table for ``level`` including progressive passes (and their rate per 90)"""
+        table = self.tables[level].assign(progressive_passes=self.progressive_column(level, threshold, method))
+        if 'minutes' in table.columns:
+            table['progressive_per90'] = per90(table['progressive_passes'], table['minutes'])
+        return table
+
+    def lookup(self, level, key, threshold=DEFAULT_THRESHOLD, method='distance'):
+        """Summary row for one player/team as a dict, or zeros if it has no events"""
+        table = self.tables[level]
+        if key in table.index:
+            row = {col: table[col].loc[key].item() for col in table.columns}
+            row['progressive_passes'] = int(self.progressive_column(level, threshold, method).loc[key])
+        else:
+            row = {col: np.nan if col.endswith('_per90') else 0 for col in table.columns}
+            row['progressive_passes'] = 0
+        if 'minutes' in row:
+            row['progressive_per90'] = per90(row['progressive_passes'], row['minutes']).item()
+        row['xg_mean'] = 0 if pd.isna(row['xg_mean']) else row['xg_mean']
+        return row
+
+    def team_players(self, team_name, threshold=DEFAULT_THRESHOLD, method='distance'):
+        """(team, player) rows for one team, indexed by player"""
+        table = self.table('team_player', threshold, method)
+        if team_name not in table.index.get_level_values(0):
+            return table.iloc[0:0].droplevel(0)
+        return table.loc[team_name]
+
+
+def get_metric_tables(df_shots, df_passes, minutes=None, xg_chain=None):
+    """Return the ``MetricTables`` for these frames, building it on first use"""
+    cache = frame_cache(df_shots, 'metric_tables')
+    key = (id(df_passes), id(minutes), id(xg_chain))
+    tables = cache.get(key)
+    if tables is None:
+        tables = cache[key] = MetricTables(df_shots, df_passes, minutes, xg_chain)
+    return tables
@@ -0,0 +1,286 @@
+"""Columnar on-disk cache for parsed StatsBomb event files.
+
+Each ``events_<id>.json`` is parsed once, flattened into a typed frame (nested
+coordinate lists become float columns) and written as Parquet under
+``<data_dir>/processed``, named by the file's stem and a hash of its full
+path so same-named files in different directories never share a cache file.
+A manifest records the size, mtime and content hash of every source file so
+a cached match is only rebuilt when its JSON changes.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.instrumentation import stage
+
+# Bump whenever flatten_events changes the stored schema so old caches rebuild.
+STORE_VERSION = 4
+
+# Nested coordinate columns and how many axes each one can carry.
+COORDINATE_COLUMNS = {
+    'location': 2,
+    'pass.end_location': 2,
+    'carry.end_location': 2,
+    'shot.end_location': 3,
+    'goalkeeper.end_location': 2,
+}
+AXES = ('x', 'y', 'z')
+
+# Nested list columns that have no flat representation in the event table.
+# Starting XI lineups are expanded to one row per player before flattening.
+DROPPED_COLUMNS = ['related_events', 'tactics.lineup']
+
+# Shot freeze frames are stored as one list per shot for each player attribute.
+# They are only read when asked for by name (see scripts/freeze_frames.py).
+FREEZE_FRAME_COLUMNS = {
+    'shot.freeze_frame_x': 'float64',
+    'shot.freeze_frame_y': 'float64',
+    'shot.freeze_frame_teammate': 'bool',
+    'shot.freeze_frame_position': 'int16',
+}
+
+
+def flat_coordinate_columns(*fields):
+    """Flat float column names for the given coordinate fields"""
+    return [f'{field}_{AXES[axis]}' for field in fields for axis in range(COORDINATE_COLUMNS[field])]
+
+
+def apply_event_schema(df, coordinate_columns=()):
+    """Cast a loaded frame to the fixed schema: float64 coordinates, categorical names.
+
+    Every column in ``coordinate_columns`` is guaranteed to exist, and every
+    ``*.name`` column (players, teams, types, outcomes, ...) becomes categorical.
+    """
+    for col in coordinate_columns:
+        df[col] = df[col].astype('float64') if col in df.columns else np.nan
+    for col in df.columns:
+        if col.endswith('.name') and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def default_store_dir(data_dir='data'):
+    return Path(data_dir) / 'processed'
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """Return the SHA-1 hex digest of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def split_coordinates(values, width):
+    """Split a column of coordinate lists into a float array of shape (n, width)"""
+    out = np.full((len(values), width), np.nan)
+    present = [i for i, v in enumerate(values) if isinstance(v, (list, tuple)) and v]
+    if present:
+        padded = [list(values[i][:width]) + [np.nan] * (width - len(values[i])) for i in present]
+        out[present] = np.asarray(padded, dtype=float)
+    return out
+
+
+def expand_lineups(events):
+    """Replace each ``Starting XI`` event with one copy per starter carrying their ``player`` and ``position``"""
+    expanded = []
+    for event in events:
+        lineup = event.get('tactics', {}).get('lineup') if event.get('type', {}).get('name') == 'Starting XI' else None
+        if not lineup:
+            expanded.append(event)
+            continue
+        base = {key: value for key, value in event.items() if key != 'tactics'}
+        for starter in lineup:
+            expanded.append({**base, 'player': starter.get('player'), 'position': starter.get('position'),
+                             'jersey_number': starter.get('jersey_number')})
+    return expanded
+
+
+def split_freeze_frames(values):
+    """Per-shot arrays of x, y, teammate flag and position id from a column of freeze frames"""
+    columns = {name: np.full(len(values), None, dtype=object) for name in FREEZE_FRAME_COLUMNS}
+    for i, frame in enumerate(values):
+        if not isinstance(frame, list) or not frame:
+            continue
+        locations = [player.get('location') or [np.nan, np.nan] for player in frame]
+        attributes = {
+            'shot.freeze_frame_x': [location[0] for location in locations],
+            'shot.freeze_frame_y': [location[1] for location in locations],
+            'shot.freeze_frame_teammate': [bool(player.get('teammate')) for player in frame],
+            'shot.freeze_frame_position': [(player.get('position') or {}).get('id', 0) for player in frame],
+        }
+        for name, dtype in FREEZE_FRAME_COLUMNS.items():
+            columns[name][i] = np.asarray(attributes[name], dtype=dtype)
+    return columns
+
+
+def flatten_events(df):
+    """Replace nested coordinate lists with float columns, freeze frames with per-attribute lists, and drop other list columns"""
+    if 'shot.freeze_frame' in df.columns:
+        for name, values in split_freeze_frames(df.pop('shot.freeze_frame').to_numpy(dtype=object)).items():
+            df[name] = values
+    for col, width in COORDINATE_COLUMNS.items():
+        if col not in df.columns:
+            continue
+        coords = split_coordinates(df.pop(col).to_numpy(dtype=object), width)
+        for axis in range(width):
+            df[f'{col}_{AXES[axis]}'] = coords[:, axis]
+    return df.drop(columns=[c for c in DROPPED_COLUMNS if c in df.columns])
+
+
+def match_id_from_path(file_path):
+    """Return the numeric match id encoded in an ``events_<id>.json`` filename"""
+    stem = Path(file_path).stem
+    match = re.search(r'(\d+)$', stem)
+    return int(match.group(1)) if match else stem
+
+
+def expand_fields(fields):
+    """Map requested field names to flat column names (``location`` -> ``location_x``, ...)"""
+    if fields is None:
+        return None
+    columns = ['type.name']
+    for field in fields:
+        if field in COORDINATE_COLUMNS:
+            columns.extend(f'{field}_{AXES[axis]}' for axis in range(COORDINATE_COLUMNS[field]))
+        else:
+            columns.append(field)
+    return list(dict.fromkeys(columns))
+
+
+def default_columns(names):
+    """Columns loaded when none are requested: everything but the freeze-frame lists"""
+    return [c for c in names if c not in FREEZE_FRAME_COLUMNS]
+
+
+def select_events(df, types=None, columns=None):
+    """Keep only the rows of ``types`` and the flat ``columns`` present in ``df``"""
+    if types is not None:
+        df = df[df['type.name'].isin(types)]
+    columns = default_columns(df.columns) if columns is None else [c for c in columns if c in df.columns]
+    return df[columns].reset_index(drop=True)
+
+
+def parse_events_file(file_path, types=None, fields=None, keep_all=False):
+    """Parse one StatsBomb events JSON file into a flat event frame.
+
+    Events whose type is not in ``types`` are discarded before normalization,
+    so only the requested event types are ever materialized as columns.
+    ``keep_all`` also keeps the freeze-frame columns, which are otherwise only
+    returned when named in ``fields``.
+    """
+    with stage('parse_json') as timing:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if types is not None:
+            data = [event for event in data if event.get('type', {}).get('name') in types]
+        timing.rows = len(data)
+    with stage('normalize') as timing:
+        df = flatten_events(pd.json_normalize(expand_lineups(data)))
+        timing.rows = len(df)
+    return df if keep_all else select_events(df, columns=expand_fields(fields))
+
+
+def build_match_cache(source, cache_path):
+    """Parse ``source``, write it to ``cache_path`` and return ``(events, fingerprint)``"""
+    source = Path(source)
+    df = parse_events_file(source, keep_all=True)
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(cache_path, index=False)
+    stat = source.stat()
+    entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha1': hash_file(source)}
+    return df, entry
+
+
+def read_cached_events(cache_path, types=None, columns=None):
+    """Read a cached match, decoding only the requested event types and columns"""
+    import pyarrow.parquet as pq
+
+    names = pq.read_schema(cache_path).names
+    columns = default_columns(names) if columns is None else [c for c in columns if c in names]
+    filters = [('type.name', 'in', sorted(types))] if types is not None else None
+    return pd.read_parquet(cache_path, columns=columns, filters=filters)
+
+
+class EventStore:
+    """Per-match Parquet cache keyed by the fingerprint of each source file"""
+
+    def __init__(self, store_dir):
+        self.store_dir = Path(store_dir)
+        self.manifest_path = self.store_dir / 'manifest.json'
+        self.manifest = self._read_manifest()
+        self._dirty = False
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {'version': STORE_VERSION, 'files': {}}
+        if manifest.get('version') != STORE_VERSION:
+            return {'version': STORE_VERSION, 'files': {}}
+        return manifest
+
+    def cache_path(self, source):
+        source = Path(source)
+        path_hash = hashlib.sha1(str(source.resolve()).encode()).hexdigest()[:10]
+        return self.store_dir / 'matches' / f'{source.stem}-{path_hash}.parquet'
+
+    def is_fresh(self, source):
+        """Check whether the cached copy of ``source`` matches the file on disk"""
+        entry = self.manifest['files'].get(str(source))
+        if entry is None or not self.cache_path(source).exists():
+            return False
+        stat = Path(source).stat()
+        if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return True
+        # mtime moved (copy, touch, checkout) - only rebuild if the content changed
+        if entry['size'] == stat.st_size and entry['sha1'] == hash_file(source):
+            entry['mtime_ns'] = stat.st_mtime_ns
+            self._dirty = True
+            return True
+        return False
+
+    def load(self, source, types=None, fields=None):
+        """Return the flat event frame for ``source``, rebuilding the cache if stale.
+
+        ``types`` and ``fields`` are pushed down into the Parquet read so only the
+        requested rows and columns are decoded.
+        """
+        columns = expand_fields(fields)
+        if self.is_fresh(source):
+            return read_cached_events(self.cache_path(source), types, columns)
+        df, entry = build_match_cache(source, self.cache_path(source))
+        self.record(source, entry)
+        return select_events(df, types, columns)
+
+    def record(self, source, entry):
+        """Register a freshly built cache file in the manifest"""
+        entry = dict(entry, cache=str(self.cache_path(source).relative_to(self.store_dir)))
+        self.manifest['files'][str(source)] = entry
+        self._dirty = True
+
+    def dataset_version(self):
+        """Short hash identifying the current set of cached source files and their contents"""
+        digest = hashlib.sha1(str(STORE_VERSION).encode())
+        for source, entry in sorted(self.manifest['files'].items()):
+            if Path(source).exists():
+                digest.update(f"{source}:{entry['sha1']}\n".encode())
+        return digest.hexdigest()[:16]
+
+    def save(self):
+        if not self._dirty:
+            return
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        tmp_path.replace(self.manifest_path)
+        self._dirty = False
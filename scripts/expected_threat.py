@@ -0,0 +1,131 @@
+"""Expected threat (xT) on a pitch grid, fitted from every pass, carry and shot.
+
+The pitch is split into ``XT_GRID`` cells. From all actions at once,
+``np.bincount`` gives per cell the probability of shooting, of scoring from a
+shot and of moving the ball, plus the cell-to-cell transition matrix of
+successful moves (accumulated from flattened ``start * n_cells + end`` codes).
+The xT of a cell is then the fixed point of
+
+    xT = P(shot) * P(goal | shot) + P(move) * T @ xT
+
+found by iterating from zero. Every successful pass or carry is credited
+with ``xT[end] - xT[start]`` in one indexed subtraction; failed passes and
+shots are credited nothing.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.event_store import flat_coordinate_columns
+
+XT_GRID = (16, 12)
+XT_TYPES = ('Pass', 'Carry', 'Shot')
+XT_FIELDS = ['team.name', 'player.name', 'location', 'pass.end_location', 'carry.end_location',
+             'pass.outcome.name', 'shot.outcome.name']
+XT_COORDINATES = flat_coordinate_columns('location', 'pass.end_location', 'carry.end_location')
+PITCH_SIZE = (120.0, 80.0)
+
+
+class ExpectedThreat:
+    """Fitted xT grid of shape ``(nx, ny)``: ``grid[i, j]`` is the value of x-bin ``i``, y-bin ``j``"""
+
+    def __init__(self, grid):
+        self.grid = np.asarray(grid, dtype=float)
+
+    @property
+    def shape(self):
+        return self.grid.shape
+
+    def cells(self, x, y):
+        """Flat cell index of every (x, y); -1 where a coordinate is missing"""
+        nx, ny = self.shape
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        ix = np.clip((np.nan_to_num(x) / PITCH_SIZE[0] * nx).astype(np.int64), 0, nx - 1)
+        iy = np.clip((np.nan_to_num(y) / PITCH_SIZE[1] * ny).astype(np.int64), 0, ny - 1)
+        return np.where(np.isnan(x) | np.isnan(y), -1, ix * ny + iy)
+
+    @staticmethod
+    def _moves(actions):
+        """Start and end coordinates of every action and whether it is a successful move"""
+        kind = actions['type.name'].to_numpy(dtype=object)
+        is_pass, is_carry = kind == 'Pass', kind == 'Carry'
+        end_x = np.where(is_pass, actions['pass.end_location_x'], actions['carry.end_location_x'])
+        end_y = np.where(is_pass, actions['pass.end_location_y'], actions['carry.end_location_y'])
+        completed = is_carry | (is_pass & actions['pass.outcome.name'].isna().to_numpy())
+        return end_x, end_y, completed
+
+    @classmethod
+    def fit(cls, actions, shape=XT_GRID, tol=1e-6, max_iterations=200):
+        """Fit the grid from a frame of ``XT_TYPES`` actions with the ``XT_COORDINATES`` columns"""
+        model = cls(np.zeros(shape))
+        n_cells = shape[0] * shape[1]
+        start = model.cells(actions['location_x'], actions['location_y'])
+        end_x, end_y, completed = cls._moves(actions)
+        end = model.cells(end_x, end_y)
+        kind = actions['type.name'].to_numpy(dtype=object)
+        is_shot = (kind == 'Shot') & (start >= 0)
+        is_move = (kind != 'Shot') & (start >= 0)
+        is_goal = is_shot & (actions['shot.outcome.name'].to_numpy(dtype=object) == 'Goal')
+        moved = is_move & completed & (end >= 0)
+
+        shots = np.bincount(start[is_shot], minlength=n_cells)
+        goals = np.bincount(start[is_goal], minlength=n_cells)
+        moves = np.bincount(start[is_move], minlength=n_cells)
+        total = shots + moves
+        with np.errstate(divide='ignore', invalid='ignore'):
+            shot_prob = np.where(total > 0, shots / total, 0.0)
+            move_prob = np.where(total > 0, moves / total, 0.0)
+            goal_prob = np.where(shots > 0, goals / shots, 0.0)
+            # Failed moves stay in the row total, so they count as losing the ball (value 0)
+            transitions = np.bincount(start[moved] * n_cells + end[moved], minlength=n_cells * n_cells)
+            transitions = transitions.reshape(n_cells, n_cells) / np.maximum(moves, 1)[:, None]
+
+        scoring = shot_prob * goal_prob
+        xt = np.zeros(n_cells)
+        for _ in range(max_iterations):
+            updated = scoring + move_prob * (transitions @ xt)
+            converged = np.abs(updated - xt).max() < tol
+            xt = updated
+            if converged:
+                break
+        return cls(xt.reshape(shape))
+
+    def value(self, actions):
+        """xT added by every action: ``xT[end] - xT[start]`` for successful moves, else 0"""
+        flat = self.grid.ravel()
+        start = self.cells(actions['location_x'], actions['location_y'])
+        end_x, end_y, completed = self._moves(actions)
+        end = self.cells(end_x, end_y)
+        credited = completed & (start >= 0) & (end >= 0)
+        values = np.zeros(len(actions))
+        values[credited] = flat[end[credited]] - flat[start[credited]]
+        return values
+
+    def save(self, path, version=''):
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        with open(path / 'grid.json', 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'grid': self.grid.tolist()}, f)
+
+    @classmethod
+    def open(cls, path, version=None):
+        """Grid saved under ``path``; None if missing or fitted for another ``version``"""
+        try:
+            with open(Path(path) / 'grid.json', 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if version is not None and saved.get('version') != version:
+            return None
+        return cls(saved['grid'])
+
+
+def player_xt(actions, values):
+    """Passes and carries made and xT added per (team, player), best first"""
+    moves = actions['type.name'].isin(['Pass', 'Carry']).to_numpy()
+    frame = pd.DataFrame({'moves': moves.astype(int), 'xt_added': values}, index=actions.index)
+    table = frame.groupby([actions['team.name'], actions['player.name']], observed=True).sum()
+    return table.sort_values('xt_added', ascending=False, kind='stable')
@@ -0,0 +1,199 @@
+"""Partitioned Parquet export of the loaded event frames.
+
+``PartitionedWriter`` writes a frame (or a stream of per-match frames) as a
+Hive-partitioned Parquet dataset, e.g. ``shots/match_id=8658/part-0.parquet``,
+``passes/team.name=France/...`` or
+``shots/competition.name=FIFA World Cup/season.name=2018/...``. Coordinates
+stay float columns, names are strings with missing values kept missing and
+StatsBomb's True-or-missing flags become nullable booleans, so nothing needs
+re-parsing on the way back. Rows are buffered up to ``chunk_rows`` and
+flushed, so exporting a large corpus match by match keeps memory flat.
+
+``read_export`` reads such a dataset back in the loader's schema. Its
+``filters`` are pushed down to the Parquet scan: partitions that cannot match
+are never opened, and row groups are pruned by their statistics.
+"""
+
+import os
+import shutil
+from pathlib import Path
+from urllib.parse import unquote
+
+import pandas as pd
+
+from scripts.event_store import apply_event_schema
+
+# Shorthands for partition_by; any list of column names is also accepted
+PARTITION_KEYS = {
+    'match': ['match_id'],
+    'team': ['team.name'],
+    'competition': ['competition.name', 'season.name'],
+}
+# Partition keys are typed explicitly when read back rather than inferred from the directory names, which fails
+# when every value is missing (e.g. competition.name without a matches index); other keys are strings
+PARTITION_TYPES = {'match_id': 'int64'}
+EXPORT_CHUNK_ROWS = 250_000
+EXPORT_COMPRESSION = 'zstd'
+
+
+def partition_columns(partition_by):
+    if partition_by is None:
+        return []
+    if isinstance(partition_by, str):
+        return list(PARTITION_KEYS.get(partition_by, [partition_by]))
+    return list(partition_by)
+
+
+def export_frame(df):
+    """Copy of ``df`` with types that round-trip through Parquet unchanged.
+
+    Object columns with no values at all are flags of other event types (e.g.
+    ``dribble.nutmeg`` among passes), so they are written as booleans too.
+    """
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            df[col] = series.astype('string')
+        elif series.dtype == object:
+            values = series.dropna()
+            if values.map(type).eq(bool).all():
+                df[col] = series.astype('boolean')
+            else:
+                df[col] = series.astype('string')
+    return df
+
+
+class PartitionedWriter:
+    """Append frames to a partitioned Parquet dataset at ``path``, flushing every ``chunk_rows`` rows.
+
+    The dataset is written to a temporary sibling directory and renamed into
+    place by ``close``, replacing any previous export at ``path``.
+    """
+
+    def __init__(self, path, partition_by='match', chunk_rows=EXPORT_CHUNK_ROWS):
+        self.path = Path(path)
+        self.partition_cols = partition_columns(partition_by)
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self._tmp_path = self.path.with_name(f'.{self.path.name}.tmp-{os.getpid()}')
+        self._pending = []
+        self._pending_rows = 0
+        self._chunks = 0
+        shutil.rmtree(self._tmp_path, ignore_errors=True)
+        self._tmp_path.mkdir(parents=True)
+
+    def write(self, df):
+        if df.empty:
+            return
+        missing = [col for col in self.partition_cols if col not in df.columns]
+        if missing:
+            raise ValueError(f"Cannot partition by missing columns: {missing}")
+        self._pending.append(export_frame(df))
+        self._pending_rows += len(df)
+        if self._pending_rows >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        chunk = pd.concat(self._pending, ignore_index=True)
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        pq.write_to_dataset(
+            table, self._tmp_path, partition_cols=self.partition_cols or None,
+            basename_template=f'part-{self._chunks}-{{i}}.parquet', compression=EXPORT_COMPRESSION,
+            existing_data_behavior='overwrite_or_ignore',
+        )
+        self.rows += len(chunk)
+        self._chunks += 1
+        self._pending = []
+        self._pending_rows = 0
+
+    def close(self):
+        self.flush()
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        os.rename(self._tmp_path, self.path)
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            shutil.rmtree(self._tmp_path, ignore_errors=True)
+
+
+def write_partitioned(df, path, partition_by='match', chunk_rows=EXPORT_CHUNK_ROWS):
+    """Export one frame to ``path`` in chunks of ``chunk_rows`` rows"""
+    with PartitionedWriter(path, partition_by, chunk_rows) as writer:
+        for start in range(0, len(df), chunk_rows):
+            writer.write(df.iloc[start:start + chunk_rows])
+    return writer.path
+
+
+def _hive_partitioning(path):
+    """Hive partitioning of the dataset at ``path`` with ``PARTITION_TYPES``, from the first ``key=value`` branch"""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    fields = []
+    directory = Path(path)
+    while True:
+        partitions = sorted(child for child in directory.iterdir() if child.is_dir() and '=' in child.name)
+        if not partitions:
+            break
+        key = unquote(partitions[0].name.split('=', 1)[0])
+        fields.append(pa.field(key, pa.type_for_alias(PARTITION_TYPES.get(key, 'string'))))
+        directory = partitions[0]
+    return ds.partitioning(pa.schema(fields), flavor='hive')
+
+
+def _filter_expression(filters):
+    import pyarrow.dataset as ds
+
+    expression = None
+    for col, value in filters.items():
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        term = ds.field(col).isin(values)
+        expression = term if expression is None else expression & term
+    return expression
+
+
+def read_export(path, filters=None, columns=None, coordinate_columns=()):
+    """Read an exported dataset back into the loader's schema.
+
+    ``filters`` maps a column to a value or list of values, e.g.
+    ``{'team.name': 'France'}`` or ``{'match_id': [8657, 8658]}``; only
+    matching partitions and row groups are read. ``columns`` limits the
+    columns decoded.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    partitioning = _hive_partitioning(path)
+    expression = _filter_expression(filters) if filters else None
+    # Declaring the schema keeps discovery from opening a file to infer it
+    dataset = ds.dataset(path, format='parquet', partitioning=partitioning, schema=partitioning.schema)
+    # Matches differ in which optional columns they carry, so merge the schema of every file that can
+    # match; files in partitions the filter rules out are never opened
+    pruning = {col: value for col, value in (filters or {}).items() if col in partitioning.schema.names}
+    fragments = dataset.get_fragments(filter=_filter_expression(pruning) if pruning else None)
+    schemas = [fragment.physical_schema for fragment in fragments]
+    if schemas:
+        dataset = dataset.replace_schema(
+            pa.unify_schemas(schemas + [partitioning.schema], promote_options='permissive')
+        )
+        table = dataset.to_table(columns=columns, filter=expression)
+    else:
+        table = partitioning.schema.empty_table()
+    # Files whose pandas metadata was not kept still read flags back as nullable booleans
+    df = table.to_pandas(types_mapper={pa.bool_(): pd.BooleanDtype()}.get)
+    if 'match_id' in df.columns:
+        df['match_id'] = df['match_id'].astype('int64')
+    return apply_event_schema(df, coordinate_columns)
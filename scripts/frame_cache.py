@@ -0,0 +1,20 @@
+"""Per-DataFrame memo storage tied to the lifetime of the frame.
+
+Derived arrays (progressive-pass flags, group indexes, ...) are cached against
+the frame object they were computed from and dropped when it is garbage
+collected. Loaded frames are treated as read-only; mutate a copy instead.
+"""
+
+import weakref
+
+_CACHES = {}
+
+
+def frame_cache(df, namespace):
+    """Return the memo dict for ``namespace`` attached to ``df``"""
+    key = id(df)
+    caches = _CACHES.get(key)
+    if caches is None:
+        caches = _CACHES[key] = {}
+        weakref.finalize(df, _CACHES.pop, key, None)
+    return caches.setdefault(namespace, {})
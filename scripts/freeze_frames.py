@@ -0,0 +1,172 @@
+"""Shot freeze frames as flat, memory-mappable arrays.
+
+Each shot's freeze frame lists the players around the ball at the moment of
+the shot. Instead of one Python object per player, every player of every
+shot is a row of flat arrays (``x``, ``y``, ``teammate``, ``position_id``),
+and ``offsets`` marks where each shot's players start: the players of shot
+``i`` are rows ``offsets[i]:offsets[i + 1]``. Shot-level arrays (``shot_id``,
+``match_id``, ``shot_x``, ``shot_y``) have one row per shot.
+
+The arrays are saved as ``.npy`` files and mapped read-only, so a dashboard
+process only touches the pages a query reads. Queries such as defenders in
+the shooting cone or goalkeeper distance run for every shot at once by
+repeating each shot's location over its players and reducing per shot with
+``np.bincount`` / ``np.minimum.at``.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.event_store import FREEZE_FRAME_COLUMNS
+
+FREEZE_FRAME_FIELDS = ['id', 'location', *FREEZE_FRAME_COLUMNS]
+SHOT_ARRAYS = ('shot_id', 'match_id', 'shot_x', 'shot_y', 'offsets')
+PLAYER_ARRAYS = ('x', 'y', 'teammate', 'position_id')
+
+# StatsBomb pitch: the attacking goal is at x=120 with posts at y=36 and y=44
+GOAL_X = 120.0
+POST_Y = (36.0, 44.0)
+GOALKEEPER_POSITION = 1
+
+
+def _concat(parts, dtype):
+    return np.concatenate(parts).astype(dtype, copy=False) if parts else np.empty(0, dtype=dtype)
+
+
+class FreezeFrames:
+    """Freeze frames of a set of shots; see the module docstring for the layout"""
+
+    def __init__(self, arrays):
+        for name in SHOT_ARRAYS + PLAYER_ARRAYS:
+            setattr(self, name, arrays[name])
+        self._shot_of_player = None
+
+    @classmethod
+    def from_matches(cls, matches):
+        """Build from ``(match_id, shots)`` pairs whose frames carry ``FREEZE_FRAME_FIELDS``"""
+        shot_parts = {name: [] for name in ('shot_id', 'match_id', 'shot_x', 'shot_y', 'counts')}
+        player_parts = {name: [] for name in PLAYER_ARRAYS}
+        sources = dict(zip(PLAYER_ARRAYS, FREEZE_FRAME_COLUMNS))
+        for match_id, df in matches:
+            if df.empty:
+                continue
+            frames = {name: df[col].to_numpy(dtype=object) if col in df.columns else np.full(len(df), None)
+                      for name, col in sources.items()}
+            counts = np.array([len(frame) if frame is not None else 0 for frame in frames['x']], dtype=np.int64)
+            shot_parts['shot_id'].append(df['id'].astype(str).to_numpy())
+            shot_parts['match_id'].append(np.full(len(df), match_id, dtype=np.int64))
+            shot_parts['shot_x'].append(df['location_x'].to_numpy(dtype=float))
+            shot_parts['shot_y'].append(df['location_y'].to_numpy(dtype=float))
+            shot_parts['counts'].append(counts)
+            for name, values in frames.items():
+                present = [frame for frame in values if frame is not None and len(frame)]
+                if present:
+                    player_parts[name].append(np.concatenate(present))
+        counts = _concat(shot_parts['counts'], np.int64)
+        return cls({
+            'shot_id': _concat(shot_parts['shot_id'], str),
+            'match_id': _concat(shot_parts['match_id'], np.int64),
+            'shot_x': _concat(shot_parts['shot_x'], np.float64),
+            'shot_y': _concat(shot_parts['shot_y'], np.float64),
+            'offsets': np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+            'x': _concat(player_parts['x'], np.float64),
+            'y': _concat(player_parts['y'], np.float64),
+            'teammate': _concat(player_parts['teammate'], bool),
+            'position_id': _concat(player_parts['position_id'], np.int16),
+        })
+
+    def save(self, path, version=''):
+        """Write the arrays under ``path`` atomically, tagged with ``version``"""
+        path = Path(path)
+        tmp_path = path.with_name(f'.{path.name}.tmp-{os.getpid()}')
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        tmp_path.mkdir(parents=True)
+        for name in SHOT_ARRAYS + PLAYER_ARRAYS:
+            np.save(tmp_path / f'{name}.npy', np.ascontiguousarray(getattr(self, name)))
+        with open(tmp_path / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump({'version': version, 'shots': len(self), 'players': len(self.x)}, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.rename(tmp_path, path)
+        return path
+
+    @classmethod
+    def open(cls, path, version=None):
+        """Map the arrays saved under ``path``; None if missing or saved for another ``version``"""
+        path = Path(path)
+        try:
+            with open(path / 'meta.json', 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if version is not None and meta.get('version') != version:
+            return None
+        return cls({name: np.load(path / f'{name}.npy', mmap_mode='r') for name in SHOT_ARRAYS + PLAYER_ARRAYS})
+
+    def __len__(self):
+        return len(self.shot_id)
+
+    @property
+    def counts(self):
+        """Players in each shot's freeze frame"""
+        return np.diff(self.offsets)
+
+    @property
+    def shot_of_player(self):
+        """Shot row of every player row"""
+        if self._shot_of_player is None:
+            self._shot_of_player = np.repeat(np.arange(len(self)), self.counts)
+        return self._shot_of_player
+
+    def players(self, i):
+        """Freeze frame of shot row ``i`` as a small DataFrame"""
+        rows = slice(self.offsets[i], self.offsets[i + 1])
+        return pd.DataFrame({name: np.asarray(getattr(self, name)[rows]) for name in PLAYER_ARRAYS})
+
+    def _per_shot_min(self, values, mask):
+        out = np.full(len(self), np.inf)
+        np.minimum.at(out, self.shot_of_player[mask], values[mask])
+        out[np.isinf(out)] = np.nan
+        return out
+
+    def distance_to_shot(self):
+        """Distance of every player row from its shot's location"""
+        shot = self.shot_of_player
+        return np.hypot(np.asarray(self.x) - self.shot_x[shot], np.asarray(self.y) - self.shot_y[shot])
+
+    def defenders_in_cone(self):
+        """Opponents inside the triangle between each shot's location and the goalposts"""
+        shot = self.shot_of_player
+        px, py = np.asarray(self.x), np.asarray(self.y)
+        ax, ay = self.shot_x[shot], self.shot_y[shot]
+        corners = ((ax, ay), (GOAL_X, POST_Y[0]), (GOAL_X, POST_Y[1]))
+        # A point is inside when the three edge cross products share a sign (edges included)
+        sides = [(x2 - x1) * (py - y1) - (y2 - y1) * (px - x1)
+                 for (x1, y1), (x2, y2) in zip(corners, corners[1:] + corners[:1])]
+        inside = ((sides[0] >= 0) & (sides[1] >= 0) & (sides[2] >= 0)) | \
+                 ((sides[0] <= 0) & (sides[1] <= 0) & (sides[2] <= 0))
+        in_cone = inside & ~np.asarray(self.teammate)
+        return np.bincount(shot[in_cone], minlength=len(self))
+
+    def goalkeeper_distance(self):
+        """Distance from each shot to the opposing goalkeeper; NaN if the keeper is not in the frame"""
+        keeper = (np.asarray(self.position_id) == GOALKEEPER_POSITION) & ~np.asarray(self.teammate)
+        return self._per_shot_min(self.distance_to_shot(), keeper)
+
+    def nearest_opponent_distance(self):
+        """Distance from each shot to the closest opponent in its freeze frame"""
+        return self._per_shot_min(self.distance_to_shot(), ~np.asarray(self.teammate))
+
+    def shot_context(self):
+        """Per-shot context metrics indexed by shot id; shots without a freeze frame get NaN"""
+        has_frame = self.counts > 0
+        return pd.DataFrame({
+            'players_in_frame': self.counts,
+            'defenders_in_cone': np.where(has_frame, self.defenders_in_cone(), np.nan),
+            'goalkeeper_distance': self.goalkeeper_distance(),
+            'nearest_opponent_distance': self.nearest_opponent_distance(),
+        }, index=pd.Index(np.asarray(self.shot_id), name='id'))
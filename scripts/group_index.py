@@ -0,0 +1,153 @@
+"""Row-range index from team and player names to their events.
+
+The loader sorts shots and passes by (team, player) so that every team and
+every (team, player) pair occupies one contiguous block of rows. ``GroupIndex``
+records those blocks, which lets shot maps and heatmaps fetch a player's or a
+team's events as ``iloc`` slices instead of building a boolean mask over the
+whole frame. The index (including the sort permutation) is persisted under
+the event store, one file per dataset version and load scope, so a warm start
+does not need to re-sort or even look at the names.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.frame_cache import frame_cache
+
+GROUP_COLUMNS = ('team.name', 'player.name')
+
+
+def _codes_and_names(column):
+    values = column if isinstance(column.dtype, pd.CategoricalDtype) else column.astype('category')
+    return values.cat.codes.to_numpy(), values.cat.categories.astype(str).to_numpy()
+
+
+class GroupIndex:
+    """Contiguous row ranges of every team and (team, player) pair after sorting"""
+
+    def __init__(self, order, pair_team, pair_player, pair_start, pair_stop, token=''):
+        self.order = order
+        self.is_sorted = bool(np.array_equal(order, np.arange(len(order))))
+        self.token = token
+        self.pair_team = pair_team
+        self.pair_player = pair_player
+        self.pair_start = pair_start
+        self.pair_stop = pair_stop
+        self.teams = {}
+        self.players = {}
+        for team, player, start, stop in zip(pair_team, pair_player, pair_start.tolist(), pair_stop.tolist()):
+            if team:
+                first, _ = self.teams.get(team, (start, stop))
+                self.teams[team] = (first, stop)
+            if player:
+                self.players.setdefault(player, []).append((start, stop))
+
+    @classmethod
+    def build(cls, df, token=''):
+        team_codes, team_names = _codes_and_names(df['team.name'])
+        player_codes, player_names = _codes_and_names(df['player.name'])
+        order = np.lexsort((player_codes, team_codes))
+        team_codes, player_codes = team_codes[order], player_codes[order]
+        n = len(order)
+        if n == 0:
+            empty = np.array([], dtype=np.int64)
+            return cls(order, np.array([], dtype=str), np.array([], dtype=str), empty, empty, token)
+        change = np.flatnonzero((np.diff(team_codes) != 0) | (np.diff(player_codes) != 0)) + 1
+        starts = np.concatenate(([0], change)).astype(np.int64)
+        stops = np.concatenate((change, [n])).astype(np.int64)
+        # Code -1 marks a missing name; it maps to '' and is left out of the lookups
+        pair_team = np.where(team_codes[starts] >= 0, np.append(team_names, '')[team_codes[starts]], '')
+        pair_player = np.where(player_codes[starts] >= 0, np.append(player_names, '')[player_codes[starts]], '')
+        return cls(order, pair_team, pair_player, starts, stops, token)
+
+    def sorted_view(self):
+        """The same index describing the frame after it has been reordered by ``order``"""
+        return GroupIndex(np.arange(len(self.order)), self.pair_team, self.pair_player,
+                          self.pair_start, self.pair_stop, self.token)
+
+    def ranges(self, kind, name):
+        """Row ranges in sorted order for a ``'team'`` or ``'player'``"""
+        if kind == 'team':
+            return [self.teams[name]] if name in self.teams else []
+        return self.players.get(name, [])
+
+    def rows(self, df, kind, name):
+        """Events of one team or player; a zero-copy slice when ``df`` is sorted"""
+        ranges = self.ranges(kind, name)
+        if self.is_sorted and len(ranges) == 1:
+            start, stop = ranges[0]
+            return df.iloc[start:stop]
+        if not ranges:
+            return df.iloc[0:0]
+        positions = np.concatenate([self.order[start:stop] for start, stop in ranges])
+        return df.iloc[np.sort(positions) if not self.is_sorted else positions]
+
+    def save(self, path):
+        """Write the index to a temporary sibling and rename it into place, so readers never see a partial file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'.{path.name}.tmp-{os.getpid()}')
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, order=self.order, pair_team=self.pair_team.astype(str), pair_player=self.pair_player.astype(str),
+                         pair_start=self.pair_start, pair_stop=self.pair_stop, token=np.array(self.token))
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            token = str(data['token']) if 'token' in data else ''
+            return cls(data['order'], data['pair_team'], data['pair_player'], data['pair_start'],
+                       data['pair_stop'], token)
+
+
+def register_group_index(df, index):
+    frame_cache(df, 'group_index')['index'] = index
+    return df
+
+
+def get_group_index(df):
+    """Return the index registered for ``df`` by the loader, building one on first use"""
+    cache = frame_cache(df, 'group_index')
+    index = cache.get('index')
+    if index is None:
+        index = cache['index'] = GroupIndex.build(df)
+    return index
+
+
+def group_rows(df, kind, name):
+    """Events of one ``'team'`` or ``'player'`` without scanning the whole frame"""
+    return get_group_index(df).rows(df, kind, name)
+
+
+def sort_by_group(df, index_path=None, token=''):
+    """Sort ``df`` by (team, player) and register its index.
+
+    When ``index_path`` holds an index saved under the same ``token`` (which
+    names the dataset version and what was loaded) for as many rows, its
+    stored sort permutation is reused without reading the names; otherwise the
+    index is rebuilt and written there. Frames loaded without the team and
+    player columns are returned unsorted.
+    """
+    if any(col not in df.columns for col in GROUP_COLUMNS):
+        return df
+    index = None
+    if index_path is not None and Path(index_path).exists():
+        try:
+            stored = GroupIndex.load(index_path)
+            if stored.token == token and len(stored.order) == len(df):
+                index = stored
+        except Exception:
+            # A truncated or otherwise unreadable file is just rebuilt and overwritten
+            index = None
+    if index is None:
+        index = GroupIndex.build(df, token)
+        if index_path is not None:
+            index.save(index_path)
+    sorted_df = df.take(index.order).reset_index(drop=True)
+    return register_group_index(sorted_df, index.sorted_view())
@@ -0,0 +1,176 @@
+"""Per-stage timing for the loader, CLI and dashboard hot paths.
+
+Wrap a stage in ``with stage('parse_json') as s:`` (or decorate a function
+with ``@timed()``) and, while instrumentation is enabled, its wall time,
+optional row count and peak traced memory are recorded. Each record is
+logged on the ``matchmetrics.timing`` logger, kept in a bounded in-process
+list for the dashboard's Performance panel and, given a trace file, appended
+to it as one JSON line.
+
+Disabled, ``stage`` returns a shared no-op object after one flag check, so the
+calls stay in production code. Set ``MATCHMETRICS_TRACE=1`` (and optionally
+``MATCHMETRICS_TRACE_FILE=trace.jsonl``, ``MATCHMETRICS_TRACE_MEMORY=1``) or
+call ``enable`` to turn it on. Memory tracking uses ``tracemalloc`` and
+slows the traced code down noticeably, so it is off unless asked for.
+This module only uses the standard library.
+"""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+logger = logging.getLogger('matchmetrics.timing')
+
+MAX_RECORDS = 500
+
+
+class _State:
+    enabled = False
+    memory = False
+    trace_path = None
+    from_env = False
+
+
+_state = _State()
+_records = deque(maxlen=MAX_RECORDS)
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def enable(trace_path=None, memory=False):
+    """Start recording stages; ``trace_path`` appends every record to a JSON Lines file"""
+    _state.trace_path = trace_path
+    _state.memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _state.enabled = True
+
+
+def disable():
+    _state.enabled = False
+    if _state.memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _state.memory = False
+
+
+def is_enabled():
+    return _state.enabled
+
+
+def is_env_configured():
+    """Whether ``MATCHMETRICS_TRACE`` turned recording on for the whole process"""
+    return _state.from_env
+
+
+def records():
+    """Most recent stage records, oldest first"""
+    return list(_records)
+
+
+def clear():
+    _records.clear()
+
+
+class _NullStage:
+    """Stand-in returned while disabled; accepts ``rows`` and ignores it"""
+
+    __slots__ = ('rows',)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Stage:
+    """One timed stage; set ``rows`` inside the block to record how much it processed"""
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self._child_peak = 0
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        self._memory = _state.memory and tracemalloc.is_tracing()
+        if self._memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # reset_peak would hide the enclosing stage's peak so far, so hand it up first
+            if stack:
+                stack[-1]._child_peak = max(stack[-1]._child_peak, peak)
+            tracemalloc.reset_peak()
+            self._start_memory = current
+        stack.append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self._start
+        stack = _local.stack
+        stack.pop()
+        record = {'stage': self.name, 'seconds': round(seconds, 6), 'rows': self.rows}
+        if stack:
+            record['parent'] = stack[-1].name
+        if self._memory:
+            peak = max(tracemalloc.get_traced_memory()[1], self._child_peak)
+            record['peak_mb'] = round((peak - self._start_memory) / 2**20, 3)
+            if stack:
+                stack[-1]._child_peak = max(stack[-1]._child_peak, peak)
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        _emit(record)
+        return False
+
+
+def _emit(record):
+    record['time'] = time.time()
+    _records.append(record)
+    rows = f" rows={record['rows']}" if record['rows'] is not None else ''
+    peak = f" peak={record['peak_mb']:.1f}MB" if 'peak_mb' in record else ''
+    logger.info("%s %.3fs%s%s", record['stage'], record['seconds'], rows, peak)
+    if _state.trace_path:
+        with _write_lock, open(_state.trace_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+
+def stage(name, rows=None):
+    """Context manager timing ``name``; a no-op while instrumentation is disabled"""
+    if not _state.enabled:
+        return _NULL_STAGE
+    return Stage(name, rows)
+
+
+def timed(name=None):
+    """Decorator timing every call of a function as a stage (default name: the function's)"""
+    def decorate(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state.enabled:
+                return func(*args, **kwargs)
+            with Stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def configure_from_env():
+    if os.environ.get('MATCHMETRICS_TRACE', '') not in ('', '0'):
+        enable(os.environ.get('MATCHMETRICS_TRACE_FILE') or None,
+               memory=os.environ.get('MATCHMETRICS_TRACE_MEMORY', '') not in ('', '0'))
+        _state.from_env = True
+
+
+configure_from_env()
@@ -1,255 +1,611 @@
-import json
+import hashlib
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
-def convert_lists_to_tuples(df):
-    for col in df.columns:
-        if df[col].apply(lambda x: isinstance(x, list)).any():
-            df[col] = df[col].apply(lambda x: tuple(x) if isinstance(x, list) else x)
-    return df
+if __package__ in (None, ''):
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-def add_sample_data(df_shots, df_passes):
-    """Add sample data for Real Madrid, Manchester United, and Spain"""
-    import random
-    import uuid
-    
-    # Sample players for each team
-    teams_players = {
-        "Real Madrid": [
-            "Karim Benzema", "Vinicius Jr.", "Luka Modric", "Toni Kroos", 
-            "Federico Valverde", "Rodrygo", "Eduardo Camavinga", "Dani Carvajal"
-        ],
-        "Manchester United": [
-            "Marcus Rashford", "Bruno Fernandes", "Jadon Sancho", "Anthony Martial",
-            "Mason Greenwood", "Paul Pogba", "Luke Shaw", "Harry Maguire"
-        ],
-        "Spain": [
-            "Alvaro Morata", "Pedri", "Gavi", "Sergio Busquets", 
-            "Ferran Torres", "Dani Olmo", "Pau Torres", "Jordi Alba"
-        ]
-    }
-    
-    sample_shots = []
-    sample_passes = []
-    
-    for team, players in teams_players.items():
-        for player in players:
-            # Generate shots for each player
-            num_shots = random.randint(2, 8)
-            for _ in range(num_shots):
-                shot_data = {
-                    'id': str(uuid.uuid4()),
-                    'type.name': 'Shot',
-                    'player.name': player,
-                    'team.name': team,
-                    'location': (random.uniform(90, 120), random.uniform(20, 60)),
-                    'shot.outcome.name': 'Goal' if random.random() < 0.15 else 'Saved',
-                    'shot.statsbomb_xg': random.uniform(0.02, 0.8),
-                    'minute': random.randint(1, 90),
-                    'second': random.randint(0, 59)
-                }
-                sample_shots.append(shot_data)
-            
-            # Generate passes for each player
-            num_passes = random.randint(20, 50)
-            for _ in range(num_passes):
-                start_x = random.uniform(20, 100)
-                end_x = start_x + random.uniform(-10, 25)
-                pass_data = {
-                    'id': str(uuid.uuid4()),
-                    'type.name': 'Pass',
-                    'player.name': player,
-                    'team.name': team,
-                    'location': (start_x, random.uniform(10, 70)),
-                    'pass.end_location': (end_x, random.uniform(10, 70)),
-                    'minute': random.randint(1, 90),
-                    'second': random.randint(0, 59)
-                }
-                sample_passes.append(pass_data)
-    
-    # Convert to DataFrames
-    if sample_shots:
-        sample_shots_df = pd.DataFrame(sample_shots)
-        sample_shots_df = convert_lists_to_tuples(sample_shots_df)
-        df_shots = pd.concat([df_shots, sample_shots_df], ignore_index=True)
-    
-    if sample_passes:
-        sample_passes_df = pd.DataFrame(sample_passes)
-        sample_passes_df = convert_lists_to_tuples(sample_passes_df)
-        df_passes = pd.concat([df_passes, sample_passes_df], ignore_index=True)
-    
+from scripts.event_store import (
+    STORE_VERSION, EventStore, apply_event_schema, build_match_cache, default_store_dir, expand_fields,
+    flat_coordinate_columns, match_id_from_path, parse_events_file, read_cached_events, select_events,
+)
+from scripts.aggregates import get_metric_tables
+from scripts.freeze_frames import FREEZE_FRAME_FIELDS, FreezeFrames
+from scripts.expected_threat import XT_COORDINATES, XT_FIELDS, XT_TYPES, ExpectedThreat, player_xt
+from scripts.export import PartitionedWriter, read_export, write_partitioned
+from scripts.match_index import (
+    PARTITION_COLUMNS, SAMPLE_COMPETITION, attach_competitions, load_match_index, match_index_token,
+    select_match_files,
+)
+from scripts.minutes_played import LINEUP_FIELDS, LINEUP_TYPES, compute_minutes_played
+from scripts.possession_chains import CHAIN_FIELDS, CHAIN_TYPES, compute_xg_chain
+from scripts.group_index import group_rows, sort_by_group
+from scripts.instrumentation import stage, timed
+from scripts.shared_dataset import (
+    MATCH_TABLES, attach_dataset, attach_match_tables, latest_shared_dataset, publish_dataset, read_sources,
+    shared_dataset_dir,
+)
+from scripts.progressive_passes import DEFAULT_THRESHOLD, progressive_pass_flags
+from scripts.synthetic_data import SAMPLE_SEED, SAMPLE_TEAMS, generate_synthetic_events, generate_synthetic_minutes
+
+SHOT_COORDINATES = flat_coordinate_columns('location', 'shot.end_location')
+PASS_COORDINATES = flat_coordinate_columns('location', 'pass.end_location')
+
+# StatsBomb pitch extent and the default grid for binned heatmaps
+PITCH_RANGE = [[0, 120], [0, 80]]
+HEATMAP_BINS = (24, 16)
+
+def add_sample_data(df_shots, df_passes, seed=SAMPLE_SEED):
+    """Add deterministic sample data for Real Madrid, Manchester United, and Spain"""
+    # Six fixtures give every team four matches: ~40 shots and ~280 passes per squad
+    sample_shots, sample_passes = generate_synthetic_events(
+        n_matches=6, teams=SAMPLE_TEAMS, shots_per_match=10, passes_per_match=70, seed=seed
+    )
+    sample_shots['competition.name'] = sample_passes['competition.name'] = SAMPLE_COMPETITION
+    df_shots = pd.concat([df_shots, sample_shots], ignore_index=True)
+    df_passes = pd.concat([df_passes, sample_passes], ignore_index=True)
     return df_shots, df_passes
 
-def load_statsbomb_data(data_dir='data'):
+def add_sample_minutes(minutes):
+    """Add the minutes played by the ``add_sample_data`` squads (every player plays 90 in each fixture)"""
+    sample = generate_synthetic_minutes(n_matches=6, teams=SAMPLE_TEAMS)
+    return apply_event_schema(pd.concat([minutes, sample], ignore_index=True))
+
+def _open_event_store(data_dir, use_cache):
+    if not use_cache:
+        return None
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("pyarrow is not installed; parsing event JSON without the on-disk cache")
+        return None
+    return EventStore(default_store_dir(data_dir))
+
+def _load_match_file(file_path, cache_path, fresh, types, fields):
+    """Load one match, in-process or in a pool worker; errors are returned, not raised"""
+    try:
+        if cache_path is None:
+            return file_path, parse_events_file(file_path, types=types, fields=fields), None, None
+        if fresh:
+            return file_path, read_cached_events(cache_path, types, expand_fields(fields)), None, None
+        df, entry = build_match_cache(file_path, cache_path)
+        return file_path, select_events(df, types, expand_fields(fields)), entry, None
+    except Exception as e:
+        return file_path, None, None, e
+
+def _run_load_jobs(jobs, workers):
+    """Run load jobs in order; with a pool keep at most 2 * workers matches in flight"""
+    if workers <= 1:
+        for job in jobs:
+            yield _load_match_file(*job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for job in jobs:
+            pending.append(pool.submit(_load_match_file, *job))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def find_events_files(data_dir='data', filters=None):
+    """Every events file under ``data_dir``, or only those whose match can satisfy ``filters``"""
+    files = sorted(Path(data_dir).glob('**/*events*.json'))
+    return select_match_files(files, load_match_index(data_dir), filters) if filters else files
+
+def iter_statsbomb_matches(data_dir='data', types=None, fields=None, use_cache=True, workers=1, files=None,
+                           filters=None):
+    """Yield ``(match_id, events)`` for each events file, one match at a time.
+
+    Only events whose ``type.name`` is in ``types`` and the columns listed in
+    ``fields`` are materialized (``None`` keeps everything), so peak memory is
+    bounded by a single match rather than the whole corpus. Coordinate fields
+    such as ``location`` expand to their flat ``location_x``/``location_y`` columns.
+
+    With ``workers > 1`` files are parsed in a process pool; matches are still
+    yielded in sorted filename order so results are deterministic. ``files``
+    restricts loading to those events files instead of every one in ``data_dir``.
+    ``filters`` on ``match_id``, ``competition.name`` or ``season.name`` (see
+    ``scripts/match_index.py``) skip every file of another match unopened.
+    """
     data_path = Path(data_dir)
-    events_files = list(data_path.glob('**/*events*.json'))
+    if files is None:
+        events_files = find_events_files(data_dir, filters)
+    else:
+        events_files = sorted(Path(f) for f in files)
+        if filters:
+            events_files = select_match_files(events_files, load_match_index(data_dir), filters)
     if not events_files:
-        print(f"No events JSON files found in {data_path}")
-        return pd.DataFrame(), pd.DataFrame()
-    all_events = []
-    for file_path in events_files:
-        try:
+        print(f"No events JSON files found in {data_path}" + (f" matching {filters}" if filters else ""))
+        return
+    store = _open_event_store(data_dir, use_cache)
+    if store is None:
+        jobs = ((file_path, None, False, types, fields) for file_path in events_files)
+    else:
+        jobs = ((file_path, store.cache_path(file_path), store.is_fresh(file_path), types, fields)
+                for file_path in events_files)
+    try:
+        for file_path, df, entry, error in _run_load_jobs(jobs, workers):
             print(f"Loading {file_path}")
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                df = pd.json_normalize(data)
-                df = convert_lists_to_tuples(df)
-                all_events.append(df)
-                print(f"Successfully loaded {len(df)} events from {file_path}")
-        except Exception as e:
-            print(f"Error loading {file_path}: {e}")
-            continue
-    if all_events:
-        df_events = pd.concat(all_events, ignore_index=True)
-        df_events = convert_lists_to_tuples(df_events)
-        print(f"Loaded {len(df_events)} total events")
-        df_shots = df_events[df_events['type.name'] == 'Shot'].copy()
-        df_passes = df_events[df_events['type.name'] == 'Pass'].copy()
-        df_shots = convert_lists_to_tuples(df_shots)
-        df_passes = convert_lists_to_tuples(df_passes)
-        
-        # Add sample data for Real Madrid, Manchester United, and Spain
-        df_shots, df_passes = add_sample_data(df_shots, df_passes)
-        
-        print(f"Found {len(df_shots)} shot events")
-        print(f"Found {len(df_passes)} pass events")
-        return df_shots, df_passes
+            if error is not None:
+                print(f"Error loading {file_path}: {error}")
+                continue
+            if entry is not None:
+                store.record(file_path, entry)
+            print(f"Successfully loaded {len(df)} events from {file_path}")
+            yield match_id_from_path(file_path), df
+    finally:
+        if store is not None:
+            store.save()
+
+def _read_events(data_dir, use_cache, types, fields, workers, files=None, filters=None):
+    """Unsorted shot and pass frames in the fixed schema, each row tagged with its match, competition and season"""
+    with stage('read_events') as timing:
+        matches = iter_statsbomb_matches(data_dir, types=set(types), fields=fields, use_cache=use_cache,
+                                         workers=workers, files=files, filters=filters)
+        all_events = [df.assign(match_id=match_id) for match_id, df in matches]
+        if not all_events:
+            return pd.DataFrame(), pd.DataFrame()
+        df_events = attach_competitions(pd.concat(all_events, ignore_index=True), load_match_index(data_dir))
+        timing.rows = len(df_events)
+    print(f"Loaded {len(df_events)} total events")
+    with stage('filter_types', rows=len(df_events)):
+        df_shots = df_events[df_events['type.name'] == 'Shot'].reset_index(drop=True)
+        df_passes = df_events[df_events['type.name'] == 'Pass'].reset_index(drop=True)
+        return apply_event_schema(df_shots, SHOT_COORDINATES), apply_event_schema(df_passes, PASS_COORDINATES)
+
+def _sort_events(df_shots, df_passes, data_dir, use_cache, scope=None):
+    """Sort by (team, player) so each player's events are a contiguous slice.
+
+    ``scope`` describes what was loaded (types, files, filters, sample data);
+    with it, the index is kept under the event store per dataset version and
+    scope, and indexes of older dataset versions are removed.
+    """
+    store = _open_event_store(data_dir, use_cache) if scope is not None else None
+    with stage('group_sort', rows=len(df_shots) + len(df_passes)):
+        if store is not None:
+            version = store.dataset_version()
+            token = f"{version}-{hashlib.sha1(repr(scope).encode()).hexdigest()[:12]}"
+            index_dir = store.store_dir / 'group_index'
+            df_shots = sort_by_group(df_shots, index_dir / f'shots-{token}.npz', token)
+            df_passes = sort_by_group(df_passes, index_dir / f'passes-{token}.npz', token)
+            for path in index_dir.glob('*.npz'):
+                if f'-{version}-' not in path.name:
+                    path.unlink(missing_ok=True)
+        else:
+            df_shots = sort_by_group(df_shots)
+            df_passes = sort_by_group(df_passes)
+    print(f"Found {len(df_shots)} shot events")
+    print(f"Found {len(df_passes)} pass events")
+    return df_shots, df_passes
+
+@timed()
+def load_statsbomb_data(data_dir='data', use_cache=True, types=('Shot', 'Pass'), fields=None, workers=1,
+                        sample_data=False, files=None, filters=None):
+    """Load shots and passes, reading parsed matches from the on-disk event store.
+
+    Both frames share a fixed schema: coordinates are float64 ``location_x``,
+    ``location_y``, ``pass.end_location_x``/``_y`` and ``shot.end_location_x``/``_y``/``_z``
+    columns, and every ``*.name`` column is categorical. Every event carries the
+    ``match_id`` of its file and, when a local matches index lists it, its
+    ``competition.name`` and ``season.name`` (see ``scripts/match_index.py``).
+    Rows are sorted by (team, player) and carry a ``GroupIndex`` (see
+    ``group_rows``) that is persisted under the event store.
+
+    Each events JSON file is parsed once into a Parquet file under
+    ``<data_dir>/processed`` and only re-parsed when its size, mtime and content
+    hash no longer match the store manifest. Pass ``use_cache=False`` to always
+    parse the raw JSON. ``types`` and ``fields`` restrict what is materialized
+    per match and ``workers`` parses files in a process pool (see
+    ``iter_statsbomb_matches``). ``filters`` such as
+    ``{'competition.name': 'FIFA World Cup'}`` or ``{'match_id': 8658}`` only
+    read the matching match files. ``sample_data=True`` appends the seeded demo
+    squads from ``add_sample_data``.
+    """
+    df_shots, df_passes = _read_events(data_dir, use_cache, types, fields, workers, files, filters)
+    if df_shots.empty and df_passes.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    if sample_data:
+        with stage('sample_data'):
+            df_shots, df_passes = add_sample_data(df_shots, df_passes)
+            df_shots = apply_event_schema(df_shots, SHOT_COORDINATES)
+            df_passes = apply_event_schema(df_passes, PASS_COORDINATES)
+    filters = match_filters(filters)
+    # Filters resolve to files through the matches index, so it is part of what was loaded
+    scope = (sorted(types), sorted(map(str, files)) if files is not None else None, filters,
+             match_index_token(data_dir) if filters else None, SAMPLE_SEED if sample_data else None)
+    return _sort_events(df_shots, df_passes, data_dir, use_cache, scope)
+
+def _read_match_events(data_dir, types, fields, use_cache, workers, files, filters=None):
+    """Events of ``types`` with ``fields`` from every match, each row tagged with its ``match_id``"""
+    matches = iter_statsbomb_matches(data_dir, types=set(types), fields=fields, use_cache=use_cache,
+                                     workers=workers, files=files, filters=filters)
+    events = [df.assign(match_id=match_id) for match_id, df in matches]
+    return pd.concat(events, ignore_index=True) if events else pd.DataFrame()
+
+@timed()
+def load_minutes_played(data_dir='data', use_cache=True, workers=1, sample_data=False, files=None):
+    """Minutes played per (match, team, player), from the lineup events of every match.
+
+    Only the ``Starting XI``, substitution, card and ``Half End`` events are
+    read (see ``scripts/minutes_played.py``), so this costs a fraction of a
+    full load. Join it to any per-player total to get per-90 rates.
+    """
+    events = _read_match_events(data_dir, LINEUP_TYPES, LINEUP_FIELDS, use_cache, workers, files)
+    minutes = compute_minutes_played(events)
+    if sample_data:
+        minutes = add_sample_minutes(minutes)
+    return apply_event_schema(minutes)
+
+@timed()
+def load_xg_chain(data_dir='data', use_cache=True, workers=1, files=None):
+    """xGChain and xGBuildup per (match, team, player); see ``scripts/possession_chains.py``"""
+    events = _read_match_events(data_dir, CHAIN_TYPES, CHAIN_FIELDS, use_cache, workers, files)
+    return apply_event_schema(compute_xg_chain(events))
+
+@timed()
+def load_match_tables(data_dir='data', use_cache=True, workers=1, sample_data=False, files=None, filters=None):
+    """Every table of ``MATCH_TABLES`` by name, from a single pass over the match files"""
+    events = _read_match_events(data_dir, LINEUP_TYPES + CHAIN_TYPES, list(dict.fromkeys(LINEUP_FIELDS + CHAIN_FIELDS)),
+                                use_cache, workers, files, filters)
+    minutes = compute_minutes_played(events)
+    if sample_data:
+        minutes = add_sample_minutes(minutes)
+    # Sample squads have no possession data, so they get no xGChain rows
+    return {'minutes': apply_event_schema(minutes), 'xg_chain': apply_event_schema(compute_xg_chain(events))}
+
+def freeze_frames_dir(data_dir='data'):
+    return default_store_dir(data_dir) / 'freeze_frames'
+
+@timed()
+def load_freeze_frames(data_dir='data', workers=1):
+    """Memory-mapped freeze frames of every shot (see ``scripts/freeze_frames.py``).
+
+    The flat arrays are built from the event store on first use and rebuilt
+    only when the match files change; later calls just map them.
+    """
+    path = freeze_frames_dir(data_dir)
+    frames = FreezeFrames.open(path, get_dataset_version(data_dir))
+    if frames is None:
+        matches = iter_statsbomb_matches(data_dir, types={'Shot'}, fields=FREEZE_FRAME_FIELDS, workers=workers)
+        built = FreezeFrames.from_matches(
+            (match_id, apply_event_schema(df, SHOT_COORDINATES)) for match_id, df in matches
+        )
+        # Loading refreshes the store manifest, which settles the dataset version
+        built.save(path, get_dataset_version(data_dir))
+        frames = FreezeFrames.open(path)
+    return frames
+
+def load_xt_actions(data_dir='data', use_cache=True, workers=1, filters=None):
+    """Every pass, carry and shot with just the columns the xT model needs, from the matches ``filters`` select"""
+    matches = iter_statsbomb_matches(data_dir, types=set(XT_TYPES), fields=XT_FIELDS, use_cache=use_cache,
+                                     workers=workers, filters=filters)
+    actions = [df.assign(match_id=match_id) for match_id, df in matches]
+    if not actions:
+        return pd.DataFrame()
+    return apply_event_schema(pd.concat(actions, ignore_index=True), XT_COORDINATES)
+
+@timed()
+def load_expected_threat(data_dir='data', workers=1, filters=None):
+    """Return ``(model, players)``: the xT grid and the xT each player added with passes and carries.
+
+    The grid is fitted on every pass, carry and shot (see
+    ``scripts/expected_threat.py``) and saved per dataset version, so it is
+    only refitted when the match files change. ``filters`` (as for
+    ``load_statsbomb_data``) limit the player table to the matching matches;
+    with a saved grid, only those match files are read.
+    """
+    path = default_store_dir(data_dir) / 'expected_threat'
+    model = ExpectedThreat.open(path, get_dataset_version(data_dir))
+    if model is None:
+        actions = load_xt_actions(data_dir, workers=workers)
+        if actions.empty:
+            return None, pd.DataFrame()
+        with stage('fit_xt', rows=len(actions)):
+            model = ExpectedThreat.fit(actions)
+        model.save(path, get_dataset_version(data_dir))
+        if filters:
+            match_ids = [match_id_from_path(file_path) for file_path in find_events_files(data_dir, filters)]
+            actions = actions[actions['match_id'].isin(match_ids).to_numpy()]
     else:
+        actions = load_xt_actions(data_dir, workers=workers, filters=filters)
+    if actions.empty:
+        return model, pd.DataFrame()
+    with stage('value_xt', rows=len(actions)):
+        return model, player_xt(actions, model.value(actions))
+
+def source_fingerprints(data_dir='data', filters=None):
+    """Fingerprint of every events file: its content hash when the cached copy is fresh, else size and mtime.
+
+    Added, edited or removed files change the fingerprints even before they
+    have been ingested. ``filters`` restrict them to the matching match files.
+    """
+    store = _open_event_store(data_dir, True)
+    fingerprints = {}
+    for file_path in find_events_files(data_dir, filters):
+        if store is not None and store.is_fresh(file_path):
+            fingerprints[str(file_path)] = store.manifest['files'][str(file_path)]['sha1']
+        else:
+            stat = file_path.stat()
+            fingerprints[str(file_path)] = f"{stat.st_size}:{stat.st_mtime_ns}"
+    return fingerprints
+
+def get_dataset_version(data_dir='data', sample_data=False, fingerprints=None, filters=None):
+    """Short identifier that changes whenever the loaded event data would change"""
+    fingerprints = source_fingerprints(data_dir, filters) if fingerprints is None else fingerprints
+    # Published datasets also change shape when a per-match table is added, and labels with the matches index
+    digest = hashlib.sha1(f"{STORE_VERSION}:{','.join(MATCH_TABLES)}:{match_index_token(data_dir)}".encode())
+    for source, token in sorted(fingerprints.items()):
+        digest.update(f"{source}:{token}\n".encode())
+    version = digest.hexdigest()[:16]
+    return f"{version}+sample{SAMPLE_SEED}" if sample_data else version
+
+def _cached_columns(data_dir, sources):
+    """Every column of the event-store copies of ``sources``, read from their Parquet schemas"""
+    import pyarrow.parquet as pq
+
+    store = EventStore(default_store_dir(data_dir))
+    columns = set()
+    for source in sources:
+        columns.update(pq.read_schema(store.cache_path(source)).names)
+    return columns
+
+def _update_dataset(data_dir, previous, fingerprints, workers):
+    """Previous shared dataset minus removed and changed matches, plus freshly loaded ones.
+
+    Returns None when the update cannot be done incrementally and the caller
+    should fall back to a full load.
+    """
+    old_sources = read_sources(previous)
+    if old_sources.get('match_index') != match_index_token(data_dir):
+        # Kept rows would carry the competitions of the old matches index
+        return None
+    old_files = old_sources['files']
+    match_ids = [match_id_from_path(source) for source in fingerprints]
+    if any(not isinstance(match_id, int) for match_id in match_ids) or len(set(match_ids)) != len(match_ids):
+        return None
+    changed = [source for source, token in fingerprints.items() if old_files.get(source, {}).get('token') != token]
+    removed = [source for source in old_files if source not in fingerprints]
+    stale_ids = {old_files[source]['match_id'] for source in removed + changed if source in old_files}
+    old_tables = attach_match_tables(previous)
+    if len(stale_ids) == len(old_files) or set(old_tables) != set(MATCH_TABLES):
+        return None
+    print(f"Incremental update: {len(changed)} new or changed, {len(removed)} removed match files")
+
+    old_shots, old_passes = attach_dataset(previous)
+    new_shots, new_passes = _read_events(data_dir, True, ('Shot', 'Pass'), None, workers, changed) if changed \
+        else (pd.DataFrame(), pd.DataFrame())
+    new_tables = load_match_tables(data_dir, workers=workers, files=changed) if changed else {}
+    kept_columns = _cached_columns(data_dir, [source for source in fingerprints if source not in changed])
+    pairs = [(old_shots, new_shots, SHOT_COORDINATES), (old_passes, new_passes, PASS_COORDINATES)]
+    pairs += [(old_tables[name], new_tables.get(name, pd.DataFrame()), None) for name in MATCH_TABLES]
+    merged = []
+    for old, new, coordinates in pairs:
+        parts = [old[~old['match_id'].isin(stale_ids).to_numpy()]]
+        if coordinates is not None:
+            # Columns only dropped matches had would linger as all-null columns a full load does not have
+            keep = kept_columns | set(PARTITION_COLUMNS) | set(coordinates)
+            parts[0] = parts[0].drop(columns=[col for col in parts[0].columns
+                                              if col not in keep and parts[0][col].isna().all()])
+        if not new.empty:
+            parts.append(new)
+        df = apply_event_schema(pd.concat(parts, ignore_index=True), coordinates or ())
+        # Names only seen in dropped matches would otherwise linger as empty categories
+        for col in df.select_dtypes('category').columns:
+            df[col] = df[col].cat.remove_unused_categories()
+        merged.append(df)
+    # Not persisted under the event store: the published dataset saves its own index
+    return (*_sort_events(merged[0], merged[1], data_dir, True), dict(zip(MATCH_TABLES, merged[2:])))
+
+def match_filters(filters):
+    """``filters`` with every value as a sorted list, so equal filters compare (and serialize) equal; None if empty"""
+    if not filters:
+        return None
+    return {col: sorted(value) if isinstance(value, (list, tuple, set)) else [value]
+            for col, value in sorted(filters.items())}
+
+@timed()
+def publish_shared_dataset(data_dir='data', sample_data=False, workers=1, incremental=True, filters=None):
+    """Make sure the current dataset is published to shared memory and return its directory.
+
+    Loads and publishes only when no process has published this dataset
+    version yet; see ``scripts/shared_dataset.py``. With ``incremental`` the
+    newest earlier publication is reused: rows of removed or changed match
+    files are dropped and only new or changed files are parsed. The
+    per-match minutes-played and xGChain tables are published and updated
+    alongside the events. ``filters`` (as for ``load_statsbomb_data``)
+    publish a dataset of just the matching match files, kept next to the
+    unfiltered one.
+    """
+    filters = match_filters(filters)
+    fingerprints = source_fingerprints(data_dir, filters)
+    path = shared_dataset_dir(data_dir, get_dataset_version(data_dir, sample_data, fingerprints))
+    if path.exists():
+        return path
+    previous = latest_shared_dataset(data_dir, sample_data) if incremental else None
+    frames = _update_dataset(data_dir, previous, fingerprints, workers) if previous is not None else None
+    if frames is None:
+        frames = (*load_statsbomb_data(data_dir, workers=workers, sample_data=sample_data, filters=filters),
+                  load_match_tables(data_dir, workers=workers, sample_data=sample_data, filters=filters))
+    df_shots, df_passes, match_tables = frames
+    if df_shots.empty and df_passes.empty:
+        return None
+    # Loading refreshes the store manifest, which settles the fingerprints
+    fingerprints = source_fingerprints(data_dir, filters)
+    path = shared_dataset_dir(data_dir, get_dataset_version(data_dir, sample_data, fingerprints))
+    sources = {
+        'sample_data': sample_data,
+        'filters': filters,
+        'match_index': match_index_token(data_dir),
+        'files': {source: {'token': token, 'match_id': match_id_from_path(source)}
+                  for source, token in fingerprints.items()},
+    }
+    print(f"Publishing shared dataset to {path}")
+    return publish_dataset(df_shots, df_passes, path, sources, match_tables)
+
+def load_shared_dataset(data_dir='data', sample_data=False, workers=1, filters=None):
+    """Like ``load_statsbomb_data`` but returns read-only frames mapped from the shared dataset.
+
+    Every process that calls this for the same data shares one physical copy
+    of the event columns. Only numeric and name columns are shared.
+    """
+    path = publish_shared_dataset(data_dir, sample_data, workers, filters=filters)
+    if path is None:
         return pd.DataFrame(), pd.DataFrame()
+    return attach_dataset(path)
 
 def get_top_shot_takers(df_shots, top_n=10):
     if df_shots.empty:
         return pd.DataFrame()
-    shot_counts = df_shots.groupby('player.name').size().reset_index(name='shot_count')
+    shot_counts = df_shots.groupby('player.name', observed=True).size().reset_index(name='shot_count')
     shot_counts = shot_counts.sort_values('shot_count', ascending=False)
     return shot_counts.head(top_n)
 
-def get_top_progressive_passers(df_passes, top_n=10):
+def get_top_progressive_passers(df_passes, top_n=10, threshold=DEFAULT_THRESHOLD, method='distance'):
     if df_passes.empty:
         return pd.DataFrame(), pd.DataFrame()
-    progressive_passes = df_passes.copy()
-    progressive_passes['start_x'] = progressive_passes['location'].apply(lambda x: x[0] if isinstance(x, list) and len(x) >= 2 else None)
-    progressive_passes['end_x'] = progressive_passes['pass.end_location'].apply(lambda x: x[0] if isinstance(x, list) and len(x) >= 2 else None)
-    progressive_passes['forward_distance'] = progressive_passes['end_x'] - progressive_passes['start_x']
-    progressive_passes = progressive_passes[(progressive_passes['forward_distance'] > 10) & (progressive_passes['forward_distance'].notna())]
-    top_players = progressive_passes.groupby('player.name').size().reset_index(name='progressive_pass_count').sort_values('progressive_pass_count', ascending=False).head(top_n)
-    top_teams = progressive_passes.groupby('team.name').size().reset_index(name='progressive_pass_count').sort_values('progressive_pass_count', ascending=False).head(top_n)
+    is_progressive, _ = progressive_pass_flags(df_passes, threshold, method)
+    progressive_passes = df_passes[is_progressive]
+    top_players = progressive_passes.groupby('player.name', observed=True).size().reset_index(name='progressive_pass_count').sort_values('progressive_pass_count', ascending=False).head(top_n)
+    top_teams = progressive_passes.groupby('team.name', observed=True).size().reset_index(name='progressive_pass_count').sort_values('progressive_pass_count', ascending=False).head(top_n)
     return top_players, top_teams
 
-def get_player_comparison(df_shots, df_passes, player1, player2):
+def get_player_comparison(df_shots, df_passes, player1, player2, threshold=DEFAULT_THRESHOLD, method='distance', tables=None):
     """Compare two players across key metrics"""
+    tables = tables if tables is not None else get_metric_tables(df_shots, df_passes)
     comparison_data = []
     
     for player in [player1, player2]:
-        # Shot stats
-        player_shots = df_shots[df_shots['player.name'] == player]
-        total_shots = len(player_shots)
-        goals = len(player_shots[player_shots['shot.outcome.name'] == 'Goal'])
-        conversion_rate = (goals / total_shots * 100) if total_shots > 0 else 0
-        avg_xg = player_shots['shot.statsbomb_xg'].mean() if 'shot.statsbomb_xg' in player_shots.columns and not player_shots.empty else 0
-        
-        # Pass stats
-        player_passes = df_passes[df_passes['player.name'] == player]
-        total_passes = len(player_passes)
-        
-        # Progressive passes
-        prog_passes = player_passes.copy()
-        prog_passes['start_x'] = prog_passes['location'].apply(lambda x: x[0] if isinstance(x, (list, tuple)) and len(x) >= 2 else None)
-        prog_passes['end_x'] = prog_passes['pass.end_location'].apply(lambda x: x[0] if isinstance(x, (list, tuple)) and len(x) >= 2 else None)
-        prog_passes['forward_distance'] = prog_passes['end_x'] - prog_passes['start_x']
-        progressive_passes = len(prog_passes[(prog_passes['forward_distance'] > 10) & (prog_passes['forward_distance'].notna())])
-        
-        team = player_shots['team.name'].iloc[0] if not player_shots.empty else player_passes['team.name'].iloc[0] if not player_passes.empty else "Unknown"
-        
-        comparison_data.append({
+        stats = tables.lookup('player', player, threshold, method)
+        row = {
             'Player': player,
-            'Team': team,
-            'Total Shots': total_shots,
-            'Goals': goals,
-            'Conversion Rate (%)': round(conversion_rate, 1),
-            'Avg xG per Shot': round(avg_xg, 3),
-            'Total Passes': total_passes,
-            'Progressive Passes': progressive_passes
-        })
+            'Team': tables.player_team.get(player, "Unknown"),
+            'Total Shots': stats['shots'],
+            'Goals': stats['goals'],
+            'Conversion Rate (%)': round(stats['conversion_rate'], 1),
+            'Avg xG per Shot': round(stats['xg_mean'], 3),
+            'Total Passes': stats['passes'],
+            'Progressive Passes': stats['progressive_passes']
+        }
+        if 'minutes' in stats:
+            row['Minutes Played'] = round(stats['minutes'])
+            row['Shots per 90'] = round(stats['shots_per90'], 2)
+            row['xG per 90'] = round(stats['xg_per90'], 3)
+        if 'xg_chain' in stats:
+            row['xGChain'] = round(stats['xg_chain'], 2)
+            row['xGBuildup'] = round(stats['xg_buildup'], 2)
+        comparison_data.append(row)
     
     return pd.DataFrame(comparison_data)
 
-def get_team_performance_summary(df_shots, df_passes, team_name):
+def get_team_performance_summary(df_shots, df_passes, team_name, threshold=DEFAULT_THRESHOLD, method='distance', tables=None):
     """Get comprehensive team performance metrics"""
-    team_shots = df_shots[df_shots['team.name'] == team_name]
-    team_passes = df_passes[df_passes['team.name'] == team_name]
-    
-    # Shot metrics
-    total_shots = len(team_shots)
-    total_goals = len(team_shots[team_shots['shot.outcome.name'] == 'Goal'])
-    team_conversion = (total_goals / total_shots * 100) if total_shots > 0 else 0
-    avg_team_xg = team_shots['shot.statsbomb_xg'].mean() if 'shot.statsbomb_xg' in team_shots.columns and not team_shots.empty else 0
-    
-    # Pass metrics
-    total_passes = len(team_passes)
-    prog_passes = team_passes.copy()
-    prog_passes['start_x'] = prog_passes['location'].apply(lambda x: x[0] if isinstance(x, (list, tuple)) and len(x) >= 2 else None)
-    prog_passes['end_x'] = prog_passes['pass.end_location'].apply(lambda x: x[0] if isinstance(x, (list, tuple)) and len(x) >= 2 else None)
-    prog_passes['forward_distance'] = prog_passes['end_x'] - prog_passes['start_x']
-    progressive_passes = len(prog_passes[(prog_passes['forward_distance'] > 10) & (prog_passes['forward_distance'].notna())])
+    tables = tables if tables is not None else get_metric_tables(df_shots, df_passes)
+    stats = tables.lookup('team', team_name, threshold, method)
     
     # Top performers
-    top_scorers = team_shots.groupby('player.name').agg({
-        'shot.outcome.name': lambda x: (x == 'Goal').sum()
-    }).sort_values('shot.outcome.name', ascending=False).head(3)
+    team_players = tables.team_players(team_name)
+    top_scorers = team_players[team_players['shots'] > 0][['goals']].rename(columns={'goals': 'shot.outcome.name'})
+    top_scorers = top_scorers.sort_values('shot.outcome.name', ascending=False, kind='stable').head(3)
     
-    top_shooters = team_shots.groupby('player.name').size().sort_values(ascending=False).head(3)
+    top_shooters = team_players.loc[team_players['shots'] > 0, 'shots'].sort_values(ascending=False, kind='stable').head(3)
     
     return {
         'team_name': team_name,
-        'total_shots': total_shots,
-        'total_goals': total_goals,
-        'conversion_rate': round(team_conversion, 1),
-        'avg_xg': round(avg_team_xg, 3),
-        'total_passes': total_passes,
-        'progressive_passes': progressive_passes,
+        'total_shots': stats['shots'],
+        'total_goals': stats['goals'],
+        'conversion_rate': round(stats['conversion_rate'], 1),
+        'avg_xg': round(stats['xg_mean'], 3),
+        'total_passes': stats['passes'],
+        'progressive_passes': stats['progressive_passes'],
         'top_scorers': top_scorers,
         'top_shooters': top_shooters
     }
 
-def get_position_heatmap_data(df_shots, df_passes, player_name):
-    """Get position data for creating heat maps"""
-    player_shots = df_shots[df_shots['player.name'] == player_name]
-    player_passes = df_passes[df_passes['player.name'] == player_name]
-    
-    # Extract shot positions
-    shot_positions = []
-    for _, shot in player_shots.iterrows():
-        if isinstance(shot['location'], (list, tuple)) and len(shot['location']) >= 2:
-            shot_positions.append({
-                'x': shot['location'][0],
-                'y': shot['location'][1],
-                'type': 'shot'
-            })
+def event_positions(df):
+    """Start locations of ``df`` as ``(x, y)`` float arrays, skipping events without one"""
+    x = df['location_x'].to_numpy(dtype=float)
+    y = df['location_y'].to_numpy(dtype=float)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    return x[valid], y[valid]
+
+def get_position_heatmap_data(df_shots, df_passes, player_name, bins=None):
+    """Get position data for creating heat maps.
+
+    By default each event kind maps to ``{'x': array, 'y': array}`` of raw
+    positions. With ``bins`` (e.g. ``HEATMAP_BINS``) each kind is instead a
+    density grid from ``np.histogram2d`` over the fixed 120x80 pitch, and the
+    bin edges are returned as ``x_edges``/``y_edges``.
+    """
+    player_shots = group_rows(df_shots, 'player', player_name)
+    player_passes = group_rows(df_passes, 'player', player_name)
     
-    # Extract pass start positions
-    pass_positions = []
-    for _, pass_event in player_passes.iterrows():
-        if isinstance(pass_event['location'], (list, tuple)) and len(pass_event['location']) >= 2:
-            pass_positions.append({
-                'x': pass_event['location'][0],
-                'y': pass_event['location'][1],
-                'type': 'pass'
-            })
+    # Shot positions and pass start positions
+    positions = {'shots': event_positions(player_shots), 'passes': event_positions(player_passes)}
     
-    return {
-        'shots': shot_positions,
-        'passes': pass_positions,
-        'player': player_name
-    }
+    if bins is None:
+        heatmap = {kind: {'x': x, 'y': y} for kind, (x, y) in positions.items()}
+    else:
+        heatmap = {}
+        for kind, (x, y) in positions.items():
+            grid, x_edges, y_edges = np.histogram2d(x, y, bins=bins, range=PITCH_RANGE)
+            heatmap[kind] = grid
+        heatmap['x_edges'] = x_edges
+        heatmap['y_edges'] = y_edges
+    heatmap['player'] = player_name
+    return heatmap
 
-def save_dataframes(df_shots, df_passes, output_dir='data'):
+def save_dataframes(df_shots, df_passes, output_dir='data/export', partition_by='match'):
+    """Export both frames as partitioned Parquet datasets under ``<output_dir>/shots`` and ``/passes``.
+
+    ``partition_by`` is ``'match'``, ``'team'``, ``'competition'`` or a list of columns; see
+    ``scripts/export.py``. Read them back with ``load_exported_data``.
+    """
     output_path = Path(output_dir)
-    output_path.mkdir(exist_ok=True)
     if not df_shots.empty:
-        df_shots.to_csv(output_path / 'df_shots.csv', index=False)
+        write_partitioned(df_shots, output_path / 'shots', partition_by)
     if not df_passes.empty:
-        df_passes.to_csv(output_path / 'df_passes.csv', index=False)
+        write_partitioned(df_passes, output_path / 'passes', partition_by)
+
+def export_statsbomb_data(data_dir='data', output_dir='data/export', partition_by='match', use_cache=True, workers=1,
+                          filters=None):
+    """Like ``save_dataframes(*load_statsbomb_data(...))`` but streamed one match at a time.
+
+    Only one match and one buffered chunk are in memory at once, however many
+    matches ``data_dir`` holds.
+    """
+    output_path = Path(output_dir)
+    index = load_match_index(data_dir)
+    with PartitionedWriter(output_path / 'shots', partition_by) as shots, \
+            PartitionedWriter(output_path / 'passes', partition_by) as passes:
+        for match_id, df in iter_statsbomb_matches(data_dir, types={'Shot', 'Pass'}, use_cache=use_cache,
+                                                   workers=workers, filters=filters):
+            df = attach_competitions(df.assign(match_id=match_id), index)
+            shots.write(apply_event_schema(df[df['type.name'] == 'Shot'].reset_index(drop=True), SHOT_COORDINATES))
+            passes.write(apply_event_schema(df[df['type.name'] == 'Pass'].reset_index(drop=True), PASS_COORDINATES))
+    print(f"Exported {shots.rows} shots and {passes.rows} passes to {output_path}")
+    return output_path
+
+def load_exported_data(output_dir='data/export', filters=None, columns=None):
+    """Read shots and passes written by ``save_dataframes`` or ``export_statsbomb_data``.
+
+    ``filters`` such as ``{'team.name': 'France'}`` or
+    ``{'competition.name': 'FIFA World Cup'}`` are pushed down into the
+    Parquet scan, so only the matching partitions and row groups are read.
+    """
+    output_path = Path(output_dir)
+    frames = []
+    for name, coordinates in (('shots', SHOT_COORDINATES), ('passes', PASS_COORDINATES)):
+        path = output_path / name
+        if not path.exists():
+            frames.append(pd.DataFrame())
+            continue
+        frames.append(read_export(path, filters, columns, coordinates if columns is None else ()))
+    return tuple(frames)
 
 if __name__ == "__main__":
     df_shots, df_passes = load_statsbomb_data()
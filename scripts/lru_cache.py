@@ -0,0 +1,110 @@
+"""Small thread-safe LRU cache with an optional memory cap.
+
+Used by the dashboard for query results keyed by small parameter tuples
+(dataset version, team, threshold, ...) and by the shot map renderer for PNG
+bytes. Entries are evicted least-recently-used first once either
+``max_entries`` or ``max_bytes`` is exceeded.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def estimate_size(value):
+    """Approximate memory footprint of a cached value in bytes"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(value, pd.DataFrame) else int(usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Least-recently-used mapping bounded by entry count and, optionally, bytes"""
+
+    def __init__(self, max_entries=128, max_bytes=None, sizeof=estimate_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.hits = 0
+        self.misses = 0
+        self.current_bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key][0]
+
+    def put(self, key, value):
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return value
+        with self._lock:
+            if key in self._data:
+                self.current_bytes -= self._data.pop(key)[1]
+            self._data[key] = (value, size)
+            self.current_bytes += size
+            self._evict()
+        return value
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, calling ``compute()`` on a miss"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = self.put(key, compute())
+        return value
+
+    def invalidate(self, predicate=None):
+        """Drop every entry, or only those whose key satisfies ``predicate``"""
+        with self._lock:
+            keys = [k for k in self._data if predicate is None or predicate(k)]
+            for key in keys:
+                self.current_bytes -= self._data.pop(key)[1]
+        return len(keys)
+
+    def rekey(self, transform):
+        """Replace every key with ``transform(key)``, dropping entries it maps to None; order is kept"""
+        with self._lock:
+            data = OrderedDict()
+            for key, (value, size) in self._data.items():
+                new_key = transform(key)
+                if new_key is None:
+                    self.current_bytes -= size
+                else:
+                    data[new_key] = (value, size)
+            self._data = data
+
+    def stats(self):
+        return {
+            'entries': len(self._data),
+            'bytes': self.current_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+    def _evict(self):
+        while self._data and (len(self._data) > self.max_entries or
+                              (self.max_bytes is not None and self.current_bytes > self.max_bytes)):
+            _, (_, size) = self._data.popitem(last=False)
+            self.current_bytes -= size
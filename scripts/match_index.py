@@ -0,0 +1,109 @@
+"""Competition and season of every match, from a local StatsBomb matches index.
+
+StatsBomb open data lists the matches of each competition season in
+``matches/<competition_id>/<season_id>.json``. ``load_match_index`` reads
+every such file under ``data_dir`` into one small frame keyed by
+``match_id``, and ``attach_competitions`` labels loaded events with their
+``competition.name`` and ``season.name``. The index is optional: without it,
+or for matches it does not list, both columns are missing values.
+
+Every events file is one match, and so one partition of the processed data
+(its Parquet copy in the event store). ``select_match_files`` resolves
+filters on ``match_id``, ``competition.name`` and ``season.name`` to the
+events files that can match, so filtered loads only open those files.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.event_store import match_id_from_path
+
+MATCH_INDEX_COLUMNS = ['match_id', 'competition.name', 'season.name', 'match_date']
+# Columns a load can be filtered on without opening any events file
+PARTITION_COLUMNS = ('match_id', 'competition.name', 'season.name')
+SAMPLE_COMPETITION = 'Sample Data'
+
+
+def find_matches_files(data_dir='data'):
+    return sorted(path for path in Path(data_dir).glob('**/matches/**/*.json') if 'events' not in path.name)
+
+
+def match_index_token(data_dir='data'):
+    """Size and mtime of every matches file; changes whenever the index would"""
+    tokens = []
+    for path in find_matches_files(data_dir):
+        stat = path.stat()
+        tokens.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+    return ';'.join(tokens)
+
+
+def read_matches_file(path):
+    """``MATCH_INDEX_COLUMNS`` rows of one matches JSON file; empty if it is not one"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            matches = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error reading matches index {path}: {e}")
+        return []
+    if not isinstance(matches, list):
+        return []
+    return [{
+        'match_id': match['match_id'],
+        'competition.name': (match.get('competition') or {}).get('competition_name'),
+        'season.name': (match.get('season') or {}).get('season_name'),
+        'match_date': match.get('match_date'),
+    } for match in matches if isinstance(match, dict) and 'match_id' in match]
+
+
+def load_match_index(data_dir='data'):
+    """Competition, season and date per ``match_id`` from every matches file under ``data_dir``"""
+    rows = [row for path in find_matches_files(data_dir) for row in read_matches_file(path)]
+    index = pd.DataFrame(rows, columns=MATCH_INDEX_COLUMNS).drop_duplicates('match_id', keep='last')
+    index['match_id'] = index['match_id'].astype('int64')
+    for col in ('competition.name', 'season.name'):
+        index[col] = index[col].astype('category')
+    return index.set_index('match_id').sort_index()
+
+
+def attach_competitions(df, index):
+    """``df`` with the ``competition.name`` and ``season.name`` of each row's ``match_id``"""
+    rows = index.index.get_indexer(df['match_id'].to_numpy())
+    for col in ('competition.name', 'season.name'):
+        # Row -1 (not in the index) picks the trailing None
+        df[col] = pd.Categorical(np.append(index[col].astype(object).to_numpy(), None)[rows])
+    return df
+
+
+def select_match_files(files, index, filters):
+    """The events ``files`` whose match can satisfy ``filters``.
+
+    ``filters`` maps each of ``PARTITION_COLUMNS`` to a value or list of
+    values, as in ``scripts.export.read_export``. Matches missing from the
+    index only pass filters on ``match_id``.
+    """
+    unknown = set(filters) - set(PARTITION_COLUMNS)
+    if unknown:
+        raise ValueError(f"Cannot select matches by {sorted(unknown)}; use {list(PARTITION_COLUMNS)}")
+    keep = []
+    for file_path in files:
+        match_id = match_id_from_path(file_path)
+        row = index.loc[match_id] if match_id in index.index else None
+        for col, value in filters.items():
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            actual = match_id if col == 'match_id' else (row[col] if row is not None else None)
+            if actual not in values:
+                break
+        else:
+            keep.append(file_path)
+    return keep
+
+
+def indexed_competitions(files, index):
+    """Matches per (competition, season) among ``files``, largest first; unlisted matches are left out"""
+    match_ids = [match_id_from_path(file_path) for file_path in files]
+    listed = index[index.index.isin(match_ids)]
+    counts = listed.groupby(['competition.name', 'season.name'], observed=True).size()
+    return counts.rename('matches').sort_values(ascending=False, kind='stable').reset_index()
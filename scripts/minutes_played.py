@@ -0,0 +1,102 @@
+"""Minutes played per (match, team, player) from lineup, substitution and card events.
+
+Every player's time on the pitch is derived in one vectorized pass over the
+``Starting XI``, ``Substitution``, ``Player Off``/``Player On`` and
+``Half End`` events of all matches, plus the fouls and bad behaviour that
+sent a player off (``SENDING_OFF_CARDS``), which end their time like a
+substitution. Event clocks are converted to elapsed
+playing time (stoppage time included, half-time excluded) using the length
+of each period from its ``Half End`` event. Each player then contributes
+``+t`` when they leave the pitch and ``-t`` when they enter it, so their
+minutes are a single grouped sum; players still on at the final whistle
+are credited up to the end of the match.
+
+The result is a small table with one row per appearance, so per-90 rates
+for any metric are a join on the player and a divide.
+"""
+
+import numpy as np
+import pandas as pd
+
+LINEUP_TYPES = ('Starting XI', 'Substitution', 'Player Off', 'Player On', 'Half End', 'Foul Committed',
+                'Bad Behaviour')
+CARD_FIELDS = ['foul_committed.card.name', 'bad_behaviour.card.name']
+LINEUP_FIELDS = ['team.name', 'player.name', 'substitution.replacement.name', 'period', 'minute', 'second',
+                 *CARD_FIELDS]
+SENDING_OFF_CARDS = ('Red Card', 'Second Yellow')
+
+# Match clock minute at which each period kicks off; period 5 is the penalty shootout
+PERIOD_START = {1: 0, 2: 45, 3: 90, 4: 105, 5: 120}
+PERIOD_LENGTH = {1: 45, 2: 45, 3: 15, 4: 15, 5: 0}
+
+MINUTES_COLUMNS = ['match_id', 'team.name', 'player.name', 'minutes']
+
+
+def _elapsed_minutes(events):
+    """Elapsed playing time of every event and the total length of its match"""
+    period = events['period'].astype(int)
+    in_period = events['minute'] + events['second'] / 60 - period.map(PERIOD_START)
+    half_end = (events['type.name'] == 'Half End').to_numpy()
+    lengths = in_period[half_end].groupby([events['match_id'][half_end], period[half_end]]).max().unstack()
+    periods = sorted(set(period.unique()) | set(lengths.columns))
+    lengths = lengths.reindex(index=events['match_id'].unique(), columns=periods)
+    # Periods without a Half End event count at their nominal length; the shootout is not playing time
+    played = period.groupby(events['match_id']).max()
+    for p in periods:
+        nominal = np.where(played.reindex(lengths.index).to_numpy() >= p, PERIOD_LENGTH.get(p, 0), 0)
+        lengths[p] = lengths[p].fillna(pd.Series(nominal, index=lengths.index))
+    if 5 in lengths.columns:
+        lengths[5] = 0.0
+    offsets = lengths.cumsum(axis=1) - lengths
+    offset = offsets.stack().reindex(pd.MultiIndex.from_arrays([events['match_id'], period])).to_numpy()
+    elapsed = pd.Series(offset + in_period.to_numpy(), index=events.index)
+    return elapsed, lengths.sum(axis=1)
+
+
+def compute_minutes_played(events):
+    """Minutes played per appearance from lineup events carrying a ``match_id``.
+
+    ``events`` holds the ``LINEUP_TYPES`` rows of any number of matches, with
+    ``Starting XI`` already expanded to one row per starter. Returns a frame
+    with ``MINUTES_COLUMNS``; players who never came on are left out.
+    """
+    if events.empty:
+        return pd.DataFrame({col: pd.Series(dtype='float64' if col == 'minutes' else 'object')
+                             for col in MINUTES_COLUMNS})
+    events = events[events['type.name'].isin(LINEUP_TYPES).to_numpy()].reset_index(drop=True)
+    elapsed, match_length = _elapsed_minutes(events)
+    kind = events['type.name']
+    player = events['player.name'].astype(object)
+    team = events['team.name'].astype(object)
+    starters = (kind == 'Starting XI') & player.notna()
+    subs = kind == 'Substitution'
+    sent_off = np.zeros(len(events), dtype=bool)
+    for col in CARD_FIELDS:
+        if col in events.columns:
+            sent_off |= events[col].astype(object).isin(SENDING_OFF_CARDS).to_numpy()
+    replacement = events['substitution.replacement.name'].astype(object) \
+        if 'substitution.replacement.name' in events.columns else pd.Series(np.nan, index=events.index)
+    changes = pd.concat([
+        pd.DataFrame({'match_id': events['match_id'], 'team.name': team, 'player.name': player,
+                      'time': np.where(starters, 0.0, elapsed), 'on': kind.isin(['Starting XI', 'Player On'])})
+        [starters | subs | sent_off | kind.isin(['Player Off', 'Player On'])],
+        pd.DataFrame({'match_id': events['match_id'], 'team.name': team, 'player.name': replacement,
+                      'time': elapsed, 'on': True})[subs],
+    ], ignore_index=True).dropna(subset=['player.name'])
+    # Only a player on the pitch can leave it: drops cards shown to substitutes and already replaced players
+    changes = changes.sort_values(['match_id', 'team.name', 'player.name', 'time', 'on'],
+                                  ascending=[True, True, True, True, False], kind='stable', ignore_index=True)
+    step = np.where(changes['on'], 1, -1)
+    on_pitch = pd.Series(step).groupby([changes['match_id'], changes['team.name'], changes['player.name']]).cumsum()
+    changes = changes[(changes['on'] | (on_pitch - step > 0)).to_numpy()]
+    on = changes['on'].to_numpy()
+    time = changes['time'].to_numpy()
+    totals = changes[['match_id', 'team.name', 'player.name']].assign(
+        on=on.astype(int), off=(~on).astype(int), net_time=np.where(on, -time, time),
+    ).groupby(['match_id', 'team.name', 'player.name'], sort=True).sum()
+    length = match_length.reindex(totals.index.get_level_values('match_id')).to_numpy()
+    still_on = (totals['on'] - totals['off']).clip(0, 1).to_numpy()
+    minutes = np.clip(totals['net_time'].to_numpy() + still_on * length, 0, length)
+    table = totals.index.to_frame(index=False).assign(minutes=minutes)
+    return table[table['minutes'] > 0].reset_index(drop=True)[MINUTES_COLUMNS]
+
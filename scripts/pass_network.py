@@ -0,0 +1,137 @@
+"""Passing networks from completed passes and their ``pass.recipient``.
+
+A network is keyed by (match, team, window), where a window is a set of
+periods from ``NETWORK_WINDOWS``. ``PassNetworks.build`` builds every
+network in one pass over the passes frame:
+
+1. Passers and recipients are encoded as integer player ids.
+2. Each pass is repeated once for every window that contains its period.
+3. The network id, passer and recipient are packed into one int64 edge code.
+4. ``np.unique`` on the edge codes accumulates the weighted COO adjacency of
+   all networks at once, sorted by network.
+
+A node's average location is taken over the passes it made (their
+``location``) and received (their ``pass.end_location``), summed per
+(network, player) with ``np.bincount``. Because edges and nodes are sorted
+by network, ``network`` returns one network by slicing, and the slices are
+kept per (team, match, window).
+"""
+
+import numpy as np
+import pandas as pd
+
+NETWORK_WINDOWS = {
+    'Full match': (1, 2, 3, 4),
+    'First half': (1,),
+    'Second half': (2,),
+    'Extra time': (3, 4),
+}
+EDGE_COLUMNS = ['passer', 'recipient', 'passes']
+NODE_COLUMNS = ['player', 'x', 'y', 'passes_made', 'passes_received']
+
+
+def _codes(values):
+    """Integer codes and the sorted distinct values of ``values`` (missing values get -1)"""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), sort=True)
+    return codes.astype(np.int64), np.asarray(uniques, dtype=object)
+
+
+class PassNetworks:
+    """Every pass network of a passes frame as sorted COO edges and node arrays"""
+
+    def __init__(self, players, keys, edges, nodes, windows=NETWORK_WINDOWS):
+        self.players = players
+        self.keys = keys
+        self.edges = edges
+        self.nodes = nodes
+        self.windows = tuple(windows)
+        network_ids = np.arange(len(keys['team']) + 1)
+        self._edge_offsets = np.searchsorted(edges['network'], network_ids)
+        self._node_offsets = np.searchsorted(nodes['network'], network_ids)
+        self._index = {key: i for i, key in enumerate(zip(keys['team'], keys['match_id'], keys['window']))}
+        self._cache = {}
+
+    @classmethod
+    def build(cls, df_passes, windows=NETWORK_WINDOWS):
+        """Build the networks of every (match, team, window) of ``df_passes`` (see the module docstring)"""
+        completed = df_passes['pass.outcome.name'].isna().to_numpy() & \
+            df_passes['pass.recipient.name'].notna().to_numpy() & df_passes['player.name'].notna().to_numpy()
+        passes = df_passes[completed]
+        names = np.concatenate([passes['player.name'].to_numpy(dtype=object),
+                                passes['pass.recipient.name'].to_numpy(dtype=object)])
+        player_codes, players = _codes(names)
+        passer, recipient = player_codes[:len(passes)], player_codes[len(passes):]
+        team, teams = _codes(passes['team.name'].to_numpy(dtype=object))
+        match, matches = _codes(passes['match_id'].to_numpy())
+
+        # One row per (window, pass) for every window containing the pass's period
+        period = passes['period'].to_numpy()
+        member = np.stack([np.isin(period, periods) for periods in windows.values()])
+        window, row = np.nonzero(member)
+        network_code = (match[row] * len(teams) + team[row]) * len(windows) + window
+        network_codes, network = np.unique(network_code, return_inverse=True)
+        window_names = np.array(list(windows), dtype=object)
+        keys = {
+            'match_id': matches[network_codes // len(windows) // max(len(teams), 1)],
+            'team': teams[network_codes // len(windows) % max(len(teams), 1)],
+            'window': window_names[network_codes % len(windows)],
+        }
+
+        # COO accumulation: duplicates of a packed (network, passer, recipient) code are the edge weight
+        n_players = len(players)
+        edge_codes, weights = np.unique((network * n_players + passer[row]) * n_players + recipient[row],
+                                        return_counts=True)
+        edges = {
+            'network': edge_codes // (n_players * n_players),
+            'passer': edge_codes // n_players % n_players,
+            'recipient': edge_codes % n_players,
+            'passes': weights,
+        }
+
+        # Average on-ball location per (network, player): passes made from location, received at the end
+        n = len(row)
+        node_code = np.concatenate([network * n_players + passer[row], network * n_players + recipient[row]])
+        x = np.concatenate([passes['location_x'].to_numpy(dtype=float)[row],
+                            passes['pass.end_location_x'].to_numpy(dtype=float)[row]])
+        y = np.concatenate([passes['location_y'].to_numpy(dtype=float)[row],
+                            passes['pass.end_location_y'].to_numpy(dtype=float)[row]])
+        located = ~(np.isnan(x) | np.isnan(y))
+        node_codes, node = np.unique(node_code, return_inverse=True)
+        touches = np.bincount(node[located], minlength=len(node_codes))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            nodes = {
+                'network': node_codes // n_players,
+                'player': node_codes % n_players,
+                'x': np.bincount(node[located], weights=x[located], minlength=len(node_codes)) / touches,
+                'y': np.bincount(node[located], weights=y[located], minlength=len(node_codes)) / touches,
+                'passes_made': np.bincount(node[:n], minlength=len(node_codes)),
+                'passes_received': np.bincount(node[n:], minlength=len(node_codes)),
+            }
+        return cls(players, keys, edges, nodes, windows)
+
+    def __len__(self):
+        return len(self.keys['team'])
+
+    def matches(self, team):
+        """Match ids with a network for ``team``, in ascending order"""
+        return sorted({match_id for (t, match_id, _) in self._index if t == team})
+
+    def network(self, team, match_id, window='Full match'):
+        """``(nodes, edges)`` frames of one network, named by player; empty frames if there is none"""
+        key = (team, match_id, window)
+        if key not in self._cache:
+            i = self._index.get(key)
+            if i is None:
+                return pd.DataFrame(columns=NODE_COLUMNS), pd.DataFrame(columns=EDGE_COLUMNS)
+            edge_rows = slice(self._edge_offsets[i], self._edge_offsets[i + 1])
+            node_rows = slice(self._node_offsets[i], self._node_offsets[i + 1])
+            edges = pd.DataFrame({
+                'passer': self.players[self.edges['passer'][edge_rows]],
+                'recipient': self.players[self.edges['recipient'][edge_rows]],
+                'passes': self.edges['passes'][edge_rows],
+            })
+            nodes = pd.DataFrame({col: self.nodes[col][node_rows] for col in NODE_COLUMNS})
+            nodes['player'] = self.players[nodes['player'].to_numpy()]
+            self._cache[key] = (nodes, edges.sort_values('passes', ascending=False, kind='stable',
+                                                         ignore_index=True))
+        return self._cache[key]
@@ -0,0 +1,100 @@
+"""Search index over the unique player names of a dataset.
+
+Names are normalized once (accents folded, case-folded, punctuation removed)
+and their word tokens indexed by character trigram. A query first matches as
+a substring of the normalized name, so "mbappe" finds "Kylian Mbappé Lottin";
+if nothing contains it, tokens are ranked by trigram similarity to tolerate
+typos such as "mbape". Lookups only touch the unique names, so search cost
+does not grow with the number of events.
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+
+FUZZY_MIN_SIMILARITY = 0.4
+
+
+def normalize_name(text):
+    """Accent-folded, case-folded name with runs of punctuation and spaces collapsed to one space"""
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    folded = ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+    return re.sub(r'[\W_]+', ' ', folded).strip()
+
+
+def trigrams(token):
+    padded = f' {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PlayerSearchIndex:
+    """Substring and fuzzy lookup over player names; results are ids into ``names``"""
+
+    def __init__(self, names):
+        self.names = np.array(sorted({str(name) for name in names}), dtype=object)
+        self.normalized = [normalize_name(name) for name in self.names]
+        self.tokens = []
+        self.token_players = []
+        self._token_gram_counts = []
+        self._token_ids = {}
+        self._trigram_tokens = defaultdict(set)
+        for player_id, name in enumerate(self.normalized):
+            for token in name.split():
+                token_id = self._token_ids.get(token)
+                if token_id is None:
+                    token_id = self._token_ids[token] = len(self.tokens)
+                    self.tokens.append(token)
+                    self.token_players.append([])
+                    grams = trigrams(token)
+                    self._token_gram_counts.append(len(grams))
+                    for gram in grams:
+                        self._trigram_tokens[gram].add(token_id)
+                self.token_players[token_id].append(player_id)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _substring_ids(self, query):
+        if len(query) < 3 or ' ' in query:
+            return [i for i, name in enumerate(self.normalized) if query in name]
+        # Any name containing the query has a token containing all of its inner trigrams
+        grams = {query[i:i + 3] for i in range(len(query) - 2)}
+        candidates = set.intersection(*(self._trigram_tokens.get(gram, set()) for gram in grams))
+        ids = {player_id for token_id in candidates if query in self.tokens[token_id]
+               for player_id in self.token_players[token_id]}
+        return sorted(ids)
+
+    def _fuzzy_ids(self, query, min_similarity):
+        scores = {}
+        for word in query.split():
+            grams = trigrams(word)
+            shared = defaultdict(int)
+            for gram in grams:
+                for token_id in self._trigram_tokens.get(gram, ()):
+                    shared[token_id] += 1
+            for token_id, count in shared.items():
+                similarity = 2 * count / (len(grams) + self._token_gram_counts[token_id])
+                if similarity >= min_similarity:
+                    for player_id in self.token_players[token_id]:
+                        scores[player_id] = max(scores.get(player_id, 0), similarity)
+        return sorted(scores, key=lambda player_id: (-scores[player_id], player_id))
+
+    def search(self, query, fuzzy=True, min_similarity=FUZZY_MIN_SIMILARITY):
+        """Ids of the players matching ``query``; every player for an empty query.
+
+        Substring matches are returned in name order. With ``fuzzy``, a query
+        no name contains falls back to trigram similarity, best match first.
+        """
+        query = normalize_name(query)
+        if not query:
+            return np.arange(len(self.names))
+        ids = self._substring_ids(query)
+        if not ids and fuzzy:
+            ids = self._fuzzy_ids(query, min_similarity)
+        return np.array(ids, dtype=np.int64)
+
+    def matches(self, query, fuzzy=True):
+        """Names of the players matching ``query``, in ``search`` order"""
+        return self.names[self.search(query, fuzzy)].tolist()
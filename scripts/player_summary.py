@@ -0,0 +1,70 @@
+"""Small per-player summary file for answering CLI queries without loading events.
+
+``write_player_summary`` stores each player's team, shot, goal and pass
+totals as JSON next to the event store, together with the size and mtime of
+every events file it was computed from. ``read_player_summary`` returns the
+rows only while those files are unchanged. This module deliberately imports
+nothing beyond the standard library so that reading it costs milliseconds.
+"""
+
+import json
+import os
+from pathlib import Path
+
+SUMMARY_FIELDS = ('player', 'team', 'shots', 'goals', 'conversion_rate', 'xg_sum', 'passes')
+
+
+def summary_path(data_dir='data', sample_data=False):
+    # Same directory as event_store.default_store_dir, without importing pandas
+    name = 'player_summary_sample.json' if sample_data else 'player_summary.json'
+    return Path(data_dir) / 'processed' / name
+
+
+def source_stats(data_dir='data'):
+    """``{path: [size, mtime_ns]}`` for every events file under ``data_dir``"""
+    stats = {}
+    for file_path in sorted(Path(data_dir).glob('**/*events*.json')):
+        stat = file_path.stat()
+        stats[str(file_path)] = [stat.st_size, stat.st_mtime_ns]
+    return stats
+
+
+def summary_rows(tables):
+    """One dict per player with a shot or a pass, from a ``MetricTables``"""
+    table = tables.tables['player']
+    teams = tables.player_team
+    rows = []
+    for player, stats in zip(table.index, table.to_dict('records')):
+        rows.append({
+            'player': str(player),
+            'team': str(teams.get(player, '')),
+            'shots': int(stats['shots']),
+            'goals': int(stats['goals']),
+            'conversion_rate': float(stats['conversion_rate']),
+            'xg_sum': float(stats['xg_sum']),
+            'passes': int(stats['passes']),
+        })
+    return rows
+
+
+def write_player_summary(tables, data_dir='data', sample_data=False):
+    path = summary_path(data_dir, sample_data)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    summary = {'sources': source_stats(data_dir), 'players': summary_rows(tables)}
+    tmp_path = path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_player_summary(data_dir='data', sample_data=False):
+    """Summary rows if the summary still matches the events files on disk, else None"""
+    try:
+        with open(summary_path(data_dir, sample_data), 'r', encoding='utf-8') as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if summary.get('sources') != source_stats(data_dir):
+        return None
+    return summary['players']
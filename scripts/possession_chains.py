@@ -0,0 +1,79 @@
+"""xGChain and xGBuildup from possession sequences.
+
+StatsBomb numbers every possession within a match and tags each event with
+the team in possession. ``compute_xg_chain`` sorts the on-ball events of the
+team in possession by (match, possession) once. ``np.add.reduceat`` over the
+segment starts then gives each possession's total shot xG. Every distinct
+(possession, player) pair is credited with that total:
+
+- xGChain: every player with an on-ball action in the possession.
+- xGBuildup: the same, except the shooter and the player who made the key
+  pass (``pass.shot_assist`` / ``pass.goal_assist``).
+
+The result has one row per (match, team, player), so it is merged by
+``match_id`` like the other per-match tables and summed for any level.
+"""
+
+import numpy as np
+import pandas as pd
+
+CHAIN_TYPES = (
+    'Pass', 'Ball Receipt*', 'Carry', 'Dribble', 'Shot', 'Ball Recovery', 'Miscontrol', 'Dispossessed',
+    'Clearance', 'Interception', 'Block', 'Foul Won', '50/50', 'Duel', 'Shield', 'Goal Keeper',
+)
+CHAIN_FIELDS = ['possession', 'possession_team.name', 'team.name', 'player.name', 'shot.statsbomb_xg',
+                'pass.shot_assist', 'pass.goal_assist']
+CHAIN_COLUMNS = ['match_id', 'team.name', 'player.name', 'xg_chain', 'xg_buildup', 'shot_possessions']
+
+
+def _flag(events, col):
+    return events[col].fillna(False).astype(bool).to_numpy() if col in events.columns \
+        else np.zeros(len(events), dtype=bool)
+
+
+def compute_xg_chain(events):
+    """xGChain and xGBuildup per (match, team, player) from ``CHAIN_TYPES`` events carrying a ``match_id``"""
+    if events.empty or 'possession' not in events.columns:
+        return pd.DataFrame({col: pd.Series(dtype='float64' if col.startswith('xg') else 'object')
+                             for col in CHAIN_COLUMNS})
+    # Only on-ball actions of the team in possession build the chain
+    own = (events['team.name'].astype(object) == events['possession_team.name'].astype(object)).to_numpy()
+    on_ball = events['type.name'].isin(CHAIN_TYPES).to_numpy()
+    events = events[own & on_ball & events['player.name'].notna().to_numpy()]
+    order = np.lexsort((events['possession'].to_numpy(), events['match_id'].to_numpy()))
+    match_id = events['match_id'].to_numpy()[order]
+    possession = events['possession'].to_numpy()[order]
+    xg = events['shot.statsbomb_xg'].fillna(0.0).to_numpy(dtype=float)[order] \
+        if 'shot.statsbomb_xg' in events.columns else np.zeros(len(order))
+    is_shot = (events['type.name'].astype(object) == 'Shot').to_numpy()[order]
+    key_action = is_shot | (_flag(events, 'pass.shot_assist') | _flag(events, 'pass.goal_assist'))[order]
+
+    # Segment = one possession; reduceat sums xG over each contiguous run
+    new_segment = np.ones(len(order), dtype=bool)
+    new_segment[1:] = (match_id[1:] != match_id[:-1]) | (possession[1:] != possession[:-1])
+    starts = np.flatnonzero(new_segment)
+    segment = np.cumsum(new_segment) - 1
+    possession_xg = np.add.reduceat(xg, starts) if len(starts) else np.zeros(0)
+    possession_shots = np.add.reduceat(is_shot.astype(np.int64), starts) if len(starts) else np.zeros(0, np.int64)
+
+    # Distinct (possession, player) pairs, with whether the player shot or made the key pass
+    teams, team_codes = np.unique(events['team.name'].astype(object).to_numpy()[order].astype(str), return_inverse=True)
+    players, player_codes = np.unique(events['player.name'].astype(object).to_numpy()[order].astype(str),
+                                      return_inverse=True)
+    pair_code = segment.astype(np.int64) * len(players) + player_codes
+    pairs, first, pair_of_event = np.unique(pair_code, return_index=True, return_inverse=True)
+    pair_key_action = np.bincount(pair_of_event, weights=key_action, minlength=len(pairs)) > 0
+    pair_segment = pairs // len(players)
+    chain = possession_xg[pair_segment]
+    buildup = np.where(pair_key_action, 0.0, chain)
+
+    table = pd.DataFrame({
+        'match_id': match_id[first],
+        'team.name': teams[team_codes[first]],
+        'player.name': players[player_codes[first]],
+        'xg_chain': chain,
+        'xg_buildup': buildup,
+        'shot_possessions': (possession_shots[pair_segment] > 0).astype(np.int64),
+    })
+    table = table.groupby(['match_id', 'team.name', 'player.name'], sort=True, as_index=False).sum()
+    return table[CHAIN_COLUMNS]
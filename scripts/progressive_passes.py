@@ -0,0 +1,67 @@
+"""Vectorized progressive-pass flags shared by every progressive-pass metric.
+
+Two definitions are supported:
+
+- ``'distance'``: the pass moves the ball at least ``threshold`` units towards
+  the opponent goal (``pass.end_location_x - location_x > threshold``).
+- ``'goal_ratio'``: the pass ends at least ``threshold`` percent closer to the
+  centre of the opponent goal than it started.
+
+Results are computed for the whole passes frame in one NumPy pass and cached
+per (method, threshold) for as long as the frame is alive.
+"""
+
+import numpy as np
+
+from scripts.frame_cache import frame_cache
+
+GOAL_X, GOAL_Y = 120.0, 40.0
+METHODS = ('distance', 'goal_ratio')
+DEFAULT_THRESHOLD = 10
+
+
+def _pass_geometry(df_passes):
+    cache = frame_cache(df_passes, 'progressive_passes')
+    geometry = cache.get('geometry')
+    if geometry is None:
+        start_x = df_passes['location_x'].to_numpy(dtype=float)
+        start_y = df_passes['location_y'].to_numpy(dtype=float)
+        end_x = df_passes['pass.end_location_x'].to_numpy(dtype=float)
+        end_y = df_passes['pass.end_location_y'].to_numpy(dtype=float)
+        geometry = cache['geometry'] = {
+            'forward_distance': end_x - start_x,
+            'start_goal_distance': np.hypot(GOAL_X - start_x, GOAL_Y - start_y),
+            'end_goal_distance': np.hypot(GOAL_X - end_x, GOAL_Y - end_y),
+        }
+    return cache, geometry
+
+
+def progressive_pass_flags(df_passes, threshold=DEFAULT_THRESHOLD, method='distance'):
+    """Return ``(is_progressive, forward_distance)`` arrays aligned with ``df_passes``.
+
+    Passes with missing coordinates are never progressive. The returned arrays
+    are shared with the cache and must not be modified.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown progressive pass method: {method!r} (expected one of {METHODS})")
+    cache, geometry = _pass_geometry(df_passes)
+    key = (method, threshold)
+    flags = cache.get(key)
+    if flags is None:
+        with np.errstate(invalid='ignore'):
+            if method == 'distance':
+                flags = geometry['forward_distance'] > threshold
+            else:
+                flags = geometry['end_goal_distance'] <= (1 - threshold / 100) * geometry['start_goal_distance']
+                flags &= ~np.isnan(geometry['end_goal_distance'])
+        flags.flags.writeable = False
+        cache[key] = flags
+    return flags, geometry['forward_distance']
+
+
+def count_progressive_passes(df_passes, mask=None, threshold=DEFAULT_THRESHOLD, method='distance'):
+    """Count progressive passes in ``df_passes``, optionally restricted to a row mask"""
+    flags, _ = progressive_pass_flags(df_passes, threshold, method)
+    if mask is not None:
+        flags = flags & np.asarray(mask, dtype=bool)
+    return int(flags.sum())
@@ -0,0 +1,168 @@
+"""Memory-mapped copy of the loaded shot and pass frames shared between processes.
+
+``publish_dataset`` writes the canonical event columns of each frame as one
+``.npy`` file per column: numeric columns as-is and names (players, teams,
+outcomes, ...) as categorical codes with their categories in ``meta.json``.
+``attach_dataset`` maps those files read-only and wraps them in DataFrames
+without copying, so every dashboard session, replica and worker process on a
+host reads the same physical pages from the OS page cache. The small
+per-(match, team, player) tables in ``MATCH_TABLES`` are published the same
+way when available (``attach_match_tables``).
+
+Datasets live under ``<data_dir>/processed/shared/<dataset version>``; a new
+version is published next to the old one and the old directories are removed.
+Each one carries ``sources.json``, the fingerprint and match id of every
+events file it was built from, which lets the next version be built
+incrementally from it. A dataset filtered to some competitions or matches
+replaces only older datasets with the same filters.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.event_store import default_store_dir
+from scripts.group_index import GroupIndex, get_group_index, register_group_index
+
+SHARED_FRAMES = ('shots', 'passes')
+# Optional per-(match, team, player) tables published alongside: minutes played and xGChain
+MATCH_TABLES = ('minutes', 'xg_chain')
+# Text columns that are kept as categorical codes; other non-numeric columns are not shared
+SHARED_TEXT_COLUMNS = ('id',)
+
+
+def shared_root(data_dir='data'):
+    return default_store_dir(data_dir) / 'shared'
+
+
+def shared_dataset_dir(data_dir, version):
+    return shared_root(data_dir) / version
+
+
+def _shared_columns(df):
+    """Yield ``(name, values, categories)`` for every column that goes into shared memory"""
+    for col in df.columns:
+        series = df[col]
+        if col in SHARED_TEXT_COLUMNS and not isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype('category')
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            yield col, series.array.codes, series.cat.categories.tolist()
+        elif series.dtype.kind in 'biuf':
+            yield col, series.to_numpy(), None
+
+
+def publish_frame(df, path):
+    """Write ``df``'s shareable columns and its group index under ``path``"""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    columns = []
+    for i, (name, values, categories) in enumerate(_shared_columns(df)):
+        file_name = f'{i:04d}.npy'
+        np.save(path / file_name, np.ascontiguousarray(values))
+        columns.append({'name': name, 'file': file_name, 'categories': categories})
+    get_group_index(df).save(path / 'group_index.npz')
+    with open(path / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump({'rows': len(df), 'columns': columns}, f)
+
+
+def attach_frame(path):
+    """Read-only DataFrame over the memory-mapped columns under ``path``"""
+    path = Path(path)
+    with open(path / 'meta.json', 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    data = {}
+    for column in meta['columns']:
+        values = np.load(path / column['file'], mmap_mode='r')
+        if column['categories'] is not None:
+            values = pd.Categorical.from_codes(values, categories=column['categories'], validate=False)
+        data[column['name']] = values
+    # copy=False keeps one block per column backed by its mapping
+    df = pd.DataFrame(data, copy=False)
+    return register_group_index(df, GroupIndex.load(path / 'group_index.npz'))
+
+
+def read_sources(path):
+    try:
+        with open(Path(path) / 'sources.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def latest_shared_dataset(data_dir='data', sample_data=False):
+    """Most recently published dataset built with the same ``sample_data`` setting, or None"""
+    root = shared_root(data_dir)
+    if not root.exists():
+        return None
+    candidates = []
+    for path in root.iterdir():
+        sources = read_sources(path)
+        if not path.name.startswith('.') and sources is not None and sources.get('sample_data') == sample_data:
+            candidates.append((path.stat().st_mtime_ns, path))
+    return max(candidates)[1] if candidates else None
+
+
+def _same_scope(sources, other):
+    """Whether two datasets were built with the same ``sample_data`` setting and match ``filters``"""
+    return sources.get('sample_data') == other.get('sample_data') and sources.get('filters') == other.get('filters')
+
+
+def changed_matches(old_sources, new_sources):
+    """Match ids whose events differ between two datasets' ``sources.json`` (added, edited or removed)"""
+    old_files = (old_sources or {}).get('files', {})
+    new_files = (new_sources or {}).get('files', {})
+    return {
+        entry['match_id']
+        for files, others in ((old_files, new_files), (new_files, old_files))
+        for source, entry in files.items()
+        if others.get(source, {}).get('token') != entry['token']
+    }
+
+
+def publish_dataset(df_shots, df_passes, path, sources=None, match_tables=None):
+    """Atomically publish both frames, and any ``match_tables`` by name, as the shared dataset at ``path``.
+
+    Frames are written to a temporary sibling directory and renamed into place,
+    so readers never see a partial dataset. If another process published the
+    same version first, its copy is kept. Older versions built with the same
+    ``sample_data`` setting and ``filters`` are then removed; processes still
+    attached to them keep their mappings until they detach.
+    """
+    sources = sources or {}
+    path = Path(path)
+    tmp_path = path.with_name(f'.{path.name}.tmp-{os.getpid()}')
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    for name, df in zip(SHARED_FRAMES, (df_shots, df_passes)):
+        publish_frame(df, tmp_path / name)
+    for name, df in (match_tables or {}).items():
+        publish_frame(df, tmp_path / name)
+    with open(tmp_path / 'sources.json', 'w', encoding='utf-8') as f:
+        json.dump(sources, f, indent=1, sort_keys=True)
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        if not path.exists():
+            raise
+    for other in path.parent.iterdir():
+        previous = read_sources(other)
+        if other != path and not other.name.startswith('.') and \
+                (previous is None or _same_scope(previous, sources)):
+            shutil.rmtree(other, ignore_errors=True)
+    return path
+
+
+def attach_dataset(path):
+    """Return ``(df_shots, df_passes)`` mapped from a published shared dataset"""
+    path = Path(path)
+    return tuple(attach_frame(path / name) for name in SHARED_FRAMES)
+
+
+def attach_match_tables(path):
+    """``{name: frame}`` for every table of ``MATCH_TABLES`` in a published shared dataset"""
+    path = Path(path)
+    return {name: attach_frame(path / name) for name in MATCH_TABLES if (path / name).exists()}
@@ -0,0 +1,231 @@
+"""Deterministic synthetic shot and pass events for demos and load testing.
+
+Everything is drawn from a single seeded ``numpy.random.Generator`` with
+vectorized calls, so the same arguments always produce the same events and
+corpora of millions of events build in seconds. ``generate_synthetic_events``
+returns frames in the loader's schema; ``write_synthetic_corpus`` writes
+StatsBomb-shaped ``events_<id>.json`` files for exercising the full ingest path.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scripts.event_store import apply_event_schema, flat_coordinate_columns
+
+# The demo teams the dashboard's quick filters point at
+SAMPLE_TEAMS = {
+    "Real Madrid": [
+        "Karim Benzema", "Vinicius Jr.", "Luka Modric", "Toni Kroos",
+        "Federico Valverde", "Rodrygo", "Eduardo Camavinga", "Dani Carvajal"
+    ],
+    "Manchester United": [
+        "Marcus Rashford", "Bruno Fernandes", "Jadon Sancho", "Anthony Martial",
+        "Mason Greenwood", "Paul Pogba", "Luke Shaw", "Harry Maguire"
+    ],
+    "Spain": [
+        "Alvaro Morata", "Pedri", "Gavi", "Sergio Busquets",
+        "Ferran Torres", "Dani Olmo", "Pau Torres", "Jordi Alba"
+    ]
+}
+SAMPLE_SEED = 2018
+SHOT_MISS_OUTCOMES = np.array(['Saved', 'Off T', 'Blocked', 'Wayward', 'Post'])
+FIRST_MATCH_ID = 9_000_000
+
+
+def make_teams(n_teams, players_per_team):
+    """Generated team and player names: ``Team 01`` with ``Team 01 Player 01`` ..."""
+    return {
+        f"Team {t + 1:02d}": [f"Team {t + 1:02d} Player {p + 1:02d}" for p in range(players_per_team)]
+        for t in range(n_teams)
+    }
+
+
+def _fixtures(n_matches, n_teams):
+    """Home/away team numbers for each match, cycling through every pairing"""
+    match = np.arange(n_matches)
+    home = match % n_teams
+    offset = 1 + (match // n_teams) % max(n_teams - 1, 1)
+    away = (home + offset) % n_teams
+    return home, away
+
+
+def _simulate(rng, teams, n_matches, shots_per_match, passes_per_match):
+    """Draw the per-event columns shared by the frame and JSON outputs"""
+    team_names = np.array(list(teams))
+    squad_sizes = np.array([len(players) for players in teams.values()])
+    squad_offsets = np.concatenate(([0], np.cumsum(squad_sizes)[:-1]))
+    player_names = np.array([player for players in teams.values() for player in players])
+
+    home, away = _fixtures(n_matches, len(team_names))
+    # One (match, team) slot per side of every fixture
+    slot_match = np.repeat(np.arange(n_matches), 2)
+    slot_team = np.column_stack((home, away)).ravel()
+
+    def events(mean):
+        counts = rng.poisson(mean, size=len(slot_team))
+        match = np.repeat(slot_match, counts)
+        team = np.repeat(slot_team, counts)
+        player = squad_offsets[team] + (rng.random(len(team)) * squad_sizes[team]).astype(np.int64)
+        minute = rng.integers(0, 90, size=len(team))
+        return {
+            'match': match,
+            'team': team,
+            'player': player,
+            'minute': minute,
+            'second': rng.integers(0, 60, size=len(team)),
+            'period': np.where(minute < 45, 1, 2),
+        }
+
+    shots = events(shots_per_match)
+    n = len(shots['team'])
+    shots['x'] = rng.uniform(90, 120, n)
+    shots['y'] = rng.uniform(20, 60, n)
+    distance = np.hypot(120 - shots['x'], 40 - shots['y'])
+    shots['xg'] = np.clip(1 / (1 + np.exp(0.22 * distance - 1.2)), 0.01, 0.95)
+    goal = rng.random(n) < shots['xg']
+    shots['outcome'] = np.where(goal, 'Goal', SHOT_MISS_OUTCOMES[rng.integers(0, len(SHOT_MISS_OUTCOMES), n)])
+    shots['end_x'] = np.where(goal, 120.0, rng.uniform(105, 120, n))
+    shots['end_y'] = np.where(goal, rng.uniform(36.5, 43.5, n), rng.uniform(30, 50, n))
+    shots['end_z'] = rng.uniform(0, 2.6, n)
+
+    passes = events(passes_per_match)
+    n = len(passes['team'])
+    passes['x'] = rng.uniform(20, 100, n)
+    passes['y'] = rng.uniform(10, 70, n)
+    passes['end_x'] = np.clip(passes['x'] + rng.uniform(-10, 25, n), 0, 120)
+    passes['end_y'] = rng.uniform(10, 70, n)
+    incomplete = rng.random(n) < 0.2
+    passes['outcome'] = np.where(incomplete, 'Incomplete', None)
+    # Recipient is a different player of the same squad
+    team = passes['team']
+    shift = 1 + (rng.random(n) * np.maximum(squad_sizes[team] - 1, 1)).astype(np.int64)
+    recipient = squad_offsets[team] + (passes['player'] - squad_offsets[team] + shift) % squad_sizes[team]
+    passes['recipient'] = np.where(incomplete, -1, recipient)
+
+    return team_names, player_names, shots, passes
+
+
+def _event_ids(prefix, n):
+    return pd.Series(np.arange(n)).astype(str).radd(f'{prefix}-').to_numpy()
+
+
+def generate_synthetic_events(n_matches=10, n_teams=8, players_per_team=11, shots_per_match=12,
+                              passes_per_match=450, seed=0, teams=None, first_match_id=FIRST_MATCH_ID):
+    """Generate reproducible shot and pass frames in the loader's schema.
+
+    ``shots_per_match`` and ``passes_per_match`` are per-team Poisson means.
+    Pass ``teams`` (name -> list of players) to use fixed names instead of
+    ``n_teams``/``players_per_team`` generated ones.
+    """
+    teams = teams if teams is not None else make_teams(n_teams, players_per_team)
+    if len(teams) < 2:
+        raise ValueError("Synthetic fixtures need at least two teams")
+    rng = np.random.default_rng(seed)
+    team_names, player_names, shots, passes = _simulate(rng, teams, n_matches, shots_per_match, passes_per_match)
+
+    df_shots = pd.DataFrame({
+        'id': _event_ids(f'synthetic-{seed}-shot', len(shots['team'])),
+        'type.name': 'Shot',
+        'match_id': first_match_id + shots['match'],
+        'period': shots['period'],
+        'minute': shots['minute'],
+        'second': shots['second'],
+        'team.name': team_names[shots['team']],
+        'player.name': player_names[shots['player']],
+        'location_x': shots['x'],
+        'location_y': shots['y'],
+        'shot.end_location_x': shots['end_x'],
+        'shot.end_location_y': shots['end_y'],
+        'shot.end_location_z': shots['end_z'],
+        'shot.outcome.name': shots['outcome'],
+        'shot.statsbomb_xg': shots['xg'],
+    })
+    recipient = np.append(player_names, None)[passes['recipient']]
+    df_passes = pd.DataFrame({
+        'id': _event_ids(f'synthetic-{seed}-pass', len(passes['team'])),
+        'type.name': 'Pass',
+        'match_id': first_match_id + passes['match'],
+        'period': passes['period'],
+        'minute': passes['minute'],
+        'second': passes['second'],
+        'team.name': team_names[passes['team']],
+        'player.name': player_names[passes['player']],
+        'location_x': passes['x'],
+        'location_y': passes['y'],
+        'pass.end_location_x': passes['end_x'],
+        'pass.end_location_y': passes['end_y'],
+        'pass.recipient.name': recipient,
+        'pass.outcome.name': passes['outcome'],
+    })
+    df_shots = apply_event_schema(df_shots, flat_coordinate_columns('location', 'shot.end_location'))
+    df_passes = apply_event_schema(df_passes, flat_coordinate_columns('location', 'pass.end_location'))
+    return df_shots, df_passes
+
+
+
+def generate_synthetic_minutes(n_matches=10, n_teams=8, players_per_team=11, teams=None,
+                               first_match_id=FIRST_MATCH_ID):
+    """Minutes-played table for the fixtures of ``generate_synthetic_events``: every squad player plays 90"""
+    teams = teams if teams is not None else make_teams(n_teams, players_per_team)
+    team_names = list(teams)
+    home, away = _fixtures(n_matches, len(team_names))
+    rows = [(first_match_id + match, team_names[team], player)
+            for match, sides in enumerate(zip(home, away)) for team in sides for player in teams[team_names[team]]]
+    df = pd.DataFrame(rows, columns=['match_id', 'team.name', 'player.name']).assign(minutes=90.0)
+    return apply_event_schema(df)
+
+def _statsbomb_event(row, index, kind):
+    event = {
+        'id': row['id'],
+        'index': index,
+        'period': int(row['period']),
+        'minute': int(row['minute']),
+        'second': int(row['second']),
+        'type': {'name': kind},
+        'team': {'name': row['team.name']},
+        'player': {'name': row['player.name']},
+        'location': [round(row['location_x'], 2), round(row['location_y'], 2)],
+    }
+    if kind == 'Shot':
+        event['shot'] = {
+            'statsbomb_xg': round(row['shot.statsbomb_xg'], 4),
+            'end_location': [round(row['shot.end_location_x'], 2), round(row['shot.end_location_y'], 2),
+                             round(row['shot.end_location_z'], 2)],
+            'outcome': {'name': row['shot.outcome.name']},
+        }
+    else:
+        event['pass'] = {'end_location': [round(row['pass.end_location_x'], 2), round(row['pass.end_location_y'], 2)]}
+        if isinstance(row['pass.recipient.name'], str):
+            event['pass']['recipient'] = {'name': row['pass.recipient.name']}
+        if isinstance(row['pass.outcome.name'], str):
+            event['pass']['outcome'] = {'name': row['pass.outcome.name']}
+    return event
+
+
+def write_synthetic_corpus(output_dir, n_matches=100, seed=0, **kwargs):
+    """Write ``n_matches`` StatsBomb-shaped ``events_<id>.json`` files to ``output_dir``.
+
+    Accepts the same keyword arguments as ``generate_synthetic_events``.
+    Returns the list of written paths.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    df_shots, df_passes = generate_synthetic_events(n_matches=n_matches, seed=seed, **kwargs)
+    events = pd.concat([df_shots.astype({c: object for c in df_shots.select_dtypes('category').columns}),
+                        df_passes.astype({c: object for c in df_passes.select_dtypes('category').columns})],
+                       ignore_index=True)
+    events = events.sort_values(['match_id', 'period', 'minute', 'second'], kind='stable')
+    paths = []
+    for match_id, match_events in events.groupby('match_id', sort=True):
+        records = [
+            _statsbomb_event(row, i + 1, row['type.name'])
+            for i, row in enumerate(match_events.to_dict('records'))
+        ]
+        path = output_dir / f'events_{match_id}.json'
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(records, f)
+        paths.append(path)
+    return paths
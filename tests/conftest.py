@@ -0,0 +1,18 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """A data directory holding copies of the bundled events files"""
+    path = tmp_path / 'data'
+    path.mkdir()
+    for source in sorted((ROOT / 'data').glob('events_*.json')):
+        shutil.copy2(source, path / source.name)
+    return path
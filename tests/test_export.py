@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from scripts.export import read_export, write_partitioned
+from scripts.load_and_parse import PASS_COORDINATES, load_statsbomb_data
+
+
+@pytest.fixture
+def df_passes(data_dir):
+    return load_statsbomb_data(data_dir)[1]
+
+
+@pytest.mark.parametrize('partition_by', ['match', 'team', None])
+def test_export_round_trip_keeps_missing_values(df_passes, tmp_path, partition_by):
+    path = write_partitioned(df_passes, tmp_path / 'passes', partition_by=partition_by, chunk_rows=1000)
+    df = read_export(path, coordinate_columns=PASS_COORDINATES)
+
+    assert len(df) == len(df_passes)
+    assert sorted(df.columns) == sorted(df_passes.columns)
+    for col in df_passes.columns:
+        assert df[col].isna().sum() == df_passes[col].isna().sum(), col
+    # Missing names stay missing instead of becoming the string 'nan'
+    assert not (df['pass.outcome.name'].astype(object) == 'nan').any()
+    for col in ('pass.cross', 'pass.through_ball', 'dribble.nutmeg'):
+        assert df[col].dtype == pd.BooleanDtype(), col
+    for col in df_passes.columns:
+        if col.endswith('.name'):
+            assert isinstance(df[col].dtype, pd.CategoricalDtype), col
+
+
+def test_export_filters_read_only_matching_rows(df_passes, tmp_path):
+    path = write_partitioned(df_passes, tmp_path / 'passes', partition_by='match')
+    df = read_export(path, filters={'match_id': 8658, 'team.name': 'France'})
+
+    expected = df_passes[(df_passes['match_id'] == 8658) & (df_passes['team.name'] == 'France')]
+    assert len(df) == len(expected) > 0
+    assert set(df['match_id']) == {8658}
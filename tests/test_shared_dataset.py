@@ -0,0 +1,41 @@
+import shutil
+
+import pandas as pd
+
+from scripts.load_and_parse import publish_shared_dataset
+from scripts.shared_dataset import attach_dataset, attach_match_tables
+
+
+def _frames(path):
+    df_shots, df_passes = attach_dataset(path)
+    return {'shots': df_shots, 'passes': df_passes, **attach_match_tables(path)}
+
+
+def _assert_same_frames(actual, expected):
+    assert set(actual) == set(expected)
+    for name, df in expected.items():
+        assert sorted(actual[name].columns) == sorted(df.columns), name
+        columns = sorted(df.columns)
+        order = [col for col in ('match_id', 'index', 'player.name') if col in columns]
+        pd.testing.assert_frame_equal(
+            actual[name][columns].sort_values(order, ignore_index=True),
+            df[columns].sort_values(order, ignore_index=True),
+            check_categorical=False, obj=name,
+        )
+
+
+def test_incremental_update_matches_full_rebuild(data_dir, tmp_path):
+    assert publish_shared_dataset(data_dir) is not None
+    # 8657 is the only match with 50/50 and shot-redirect events, so its columns must go with it
+    (data_dir / 'events_8657.json').unlink()
+    incremental = publish_shared_dataset(data_dir)
+
+    full_dir = tmp_path / 'full'
+    full_dir.mkdir()
+    for source in data_dir.glob('events_*.json'):
+        shutil.copy2(source, full_dir / source.name)
+    full = publish_shared_dataset(full_dir, incremental=False)
+
+    frames = _frames(incremental)
+    assert not any(col.startswith('50_50') for col in frames['shots'].columns)
+    _assert_same_frames(frames, _frames(full))
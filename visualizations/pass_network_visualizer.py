@@ -0,0 +1,29 @@
+import numpy as np
+
+from visualizations.shot_map_visualizer import draw_pitch
+
+# Edges below this many passes are left out so the network stays readable
+MIN_NETWORK_PASSES = 3
+
+def draw_pass_network(nodes, edges, title, min_passes=MIN_NETWORK_PASSES):
+    """Pass network on a fresh pitch: nodes at average on-ball locations, edge width by passes"""
+    pitch, fig, ax = draw_pitch()
+    located = nodes.dropna(subset=['x', 'y']).set_index('player')
+    edges = edges[(edges['passes'] >= min_passes).to_numpy()
+                  & edges['passer'].isin(located.index).to_numpy()
+                  & edges['recipient'].isin(located.index).to_numpy()]
+    if not edges.empty:
+        start = located.loc[edges['passer'], ['x', 'y']].to_numpy()
+        end = located.loc[edges['recipient'], ['x', 'y']].to_numpy()
+        width = 1 + 9 * edges['passes'].to_numpy() / edges['passes'].max()
+        pitch.lines(start[:, 0], start[:, 1], end[:, 0], end[:, 1], lw=width, color='white', alpha=0.6,
+                    zorder=1, ax=ax)
+    touches = (located['passes_made'] + located['passes_received']).to_numpy()
+    size = 200 + 1000 * touches / max(touches.max(), 1) if len(touches) else np.array([])
+    pitch.scatter(located['x'], located['y'], s=size, color='red', edgecolors='black', linewidth=1.5,
+                  alpha=0.9, zorder=2, ax=ax)
+    for player, row in located.iterrows():
+        pitch.annotate(player.split()[-1], xy=(row['x'], row['y'] - 3.5), ha='center', va='top',
+                       fontsize=9, color='white', zorder=3, ax=ax)
+    ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
+    return fig
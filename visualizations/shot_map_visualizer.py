@@ -1,32 +1,148 @@
+import io
+import threading
+
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from mplsoccer import Pitch
+from scripts.group_index import group_rows
+from scripts.lru_cache import LRUCache
+
+SHOT_MAP_FIGSIZE = (12, 8)
+# Which shots a map shows: None keeps all, otherwise whether the shot was a goal
+OUTCOME_FILTERS = {'all': None, 'goals': True, 'other': False}
+RENDER_CACHE_BYTES = 64 * 2 ** 20
+
+def draw_pitch(figsize=SHOT_MAP_FIGSIZE):
+    """Pitch on a standalone Agg figure; it is not registered with pyplot, so dropping it frees it"""
+    pitch = Pitch(pitch_type='statsbomb', pitch_color='grass', line_color='white')
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    fig.set_layout_engine('tight')
+    ax = fig.subplots()
+    pitch.draw(ax=ax)
+    return pitch, fig, ax
 
-def create_shot_map(df_shots, player_name, save_path=None):
-    player_shots = df_shots[df_shots['player.name'] == player_name].copy()
+def scatter_shots(pitch, ax, shots, s=100):
+    """Draw shots with one batched scatter call per outcome class; returns the count drawn"""
+    x = shots['location_x'].to_numpy(dtype=float)
+    y = shots['location_y'].to_numpy(dtype=float)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    is_goal = (shots['shot.outcome.name'] == 'Goal').to_numpy()[valid]
+    x, y = x[valid], y[valid]
+    pitch.scatter(x[~is_goal], y[~is_goal], c='blue', s=s, alpha=0.7, ax=ax)
+    pitch.scatter(x[is_goal], y[is_goal], c='red', s=s, alpha=0.7, ax=ax)
+    return len(x)
+
+def shot_legend(ax):
+    from matplotlib.patches import Patch
+    legend_elements = [Patch(facecolor='red', alpha=0.7, label='Goals'), Patch(facecolor='blue', alpha=0.7, label='Other Shots')]
+    ax.legend(handles=legend_elements, loc='upper right')
+
+def _player_shots(df_shots, player_name):
+    player_shots = group_rows(df_shots, 'player', player_name)
     if player_shots.empty:
         print(f"No shots found for player: {player_name}")
         return None
-    player_shots['x'] = player_shots['location'].apply(lambda x: x[0] if isinstance(x, (list, tuple)) and len(x) >= 2 else None)
-    player_shots['y'] = player_shots['location'].apply(lambda x: x[1] if isinstance(x, (list, tuple)) and len(x) >= 2 else None)
-    player_shots = player_shots.dropna(subset=['x', 'y'])
+    player_shots = player_shots.dropna(subset=['location_x', 'location_y'])
     if player_shots.empty:
         print(f"No valid shot locations found for player: {player_name}")
         return None
-    pitch = Pitch(pitch_type='statsbomb', pitch_color='grass', line_color='white')
-    fig, ax = pitch.draw(figsize=(12, 8))
-    x_coords = player_shots['x'].values
-    y_coords = player_shots['y'].values
-    colors = ['red' if outcome == 'Goal' else 'blue' for outcome in player_shots['shot.outcome.name']]
-    pitch.scatter(x_coords, y_coords, c=colors, s=100, alpha=0.7, ax=ax)
+    return player_shots
+
+def _draw_player_shots(pitch, ax, player_shots, player_name, outcome='all'):
+    is_goal = (player_shots['shot.outcome.name'] == 'Goal').to_numpy()
     total_shots = len(player_shots)
-    goals = len(player_shots[player_shots['shot.outcome.name'] == 'Goal'])
+    goals = int(is_goal.sum())
     conversion_rate = (goals / total_shots * 100) if total_shots > 0 else 0
+    keep_goals = OUTCOME_FILTERS[outcome]
+    scatter_shots(pitch, ax, player_shots if keep_goals is None else player_shots[is_goal == keep_goals])
     title = f"Shot Map: {player_name}\nTotal Shots: {total_shots} | Goals: {goals} | Conversion Rate: {conversion_rate:.1f}%"
     ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
-    from matplotlib.patches import Patch
-    legend_elements = [Patch(facecolor='red', alpha=0.7, label='Goals'), Patch(facecolor='blue', alpha=0.7, label='Other Shots')]
-    ax.legend(handles=legend_elements, loc='upper right')
+    shot_legend(ax)
+
+def create_shot_map(df_shots, player_name, save_path=None, outcome='all', dpi=300):
+    player_shots = _player_shots(df_shots, player_name)
+    if player_shots is None:
+        return None
+    pitch, fig, ax = draw_pitch()
+    _draw_player_shots(pitch, ax, player_shots, player_name, outcome)
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-    return fig 
\ No newline at end of file
+        fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
+    return fig
+
+class ShotMapRenderer:
+    """Renders shot maps as PNG bytes over a cached pitch background and caches the results.
+
+    For every dpi the pitch is drawn once into a template figure, with room
+    left for the title, and its pixels are kept with ``copy_from_bbox``. Each
+    render restores those pixels and draws only the player's shots, title and
+    legend on top before encoding the canvas. PNGs are kept in an LRU cache
+    keyed by (dataset version, player, outcome, dpi) and bounded by
+    ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes=RENDER_CACHE_BYTES, max_entries=256):
+        self.cache = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def render(self, df_shots, player_name, outcome='all', dpi=100, version=''):
+        """PNG bytes of ``player_name``'s shot map, or None if they have no located shots"""
+        if outcome not in OUTCOME_FILTERS:
+            raise ValueError(f"Unknown outcome filter {outcome!r}; expected one of {sorted(OUTCOME_FILTERS)}")
+        key = (version, player_name, outcome, dpi)
+        return self.cache.get_or_compute(key, lambda: self._render(df_shots, player_name, outcome, dpi))
+
+    def _template(self, dpi):
+        """``(pitch, fig, ax, background, crop)`` for ``dpi``, drawing the pitch the first time"""
+        if dpi not in self._templates:
+            pitch, fig, ax = draw_pitch()
+            fig.set_dpi(dpi)
+            # Lay the figure out around a two-line title like the real ones, then freeze it
+            ax.set_title('Shot Map\nTotal Shots', fontsize=16, fontweight='bold', pad=20)
+            fig.canvas.draw()
+            fig.set_layout_engine('none')
+            # Pixel rows and columns that savefig(bbox_inches='tight') would keep
+            x0, y0, x1, y1 = np.round(np.array(fig.get_tightbbox().padded(0.1).extents) * dpi).astype(int)
+            height = fig.canvas.get_width_height()[1]
+            crop = (slice(max(height - y1, 0), height - max(y0, 0)), slice(max(x0, 0), x1))
+            ax.title.set_visible(False)
+            fig.canvas.draw()
+            self._templates[dpi] = (pitch, fig, ax, fig.canvas.copy_from_bbox(fig.bbox), crop)
+        return self._templates[dpi]
+
+    def _render(self, df_shots, player_name, outcome, dpi):
+        from matplotlib.image import imsave
+
+        player_shots = _player_shots(df_shots, player_name)
+        if player_shots is None:
+            return None
+        with self._lock:
+            pitch, fig, ax, background, crop = self._template(dpi)
+            pitch_artists = set(ax.get_children())
+            try:
+                _draw_player_shots(pitch, ax, player_shots, player_name, outcome)
+                fig.canvas.restore_region(background)
+                ax.title.set_visible(True)
+                for artist in sorted(set(ax.get_children()) - pitch_artists, key=lambda a: a.get_zorder()):
+                    ax.draw_artist(artist)
+                ax.draw_artist(ax.title)
+                buffer = io.BytesIO()
+                imsave(buffer, np.asarray(fig.canvas.buffer_rgba())[crop], format='png', dpi=dpi)
+            finally:
+                for artist in set(ax.get_children()) - pitch_artists:
+                    artist.remove()
+                ax.set_title('')
+                ax.title.set_visible(False)
+            return buffer.getvalue()
+
+_default_renderer = None
+
+def render_shot_map_png(df_shots, player_name, outcome='all', dpi=100, version=''):
+    """Cached PNG shot map from a process-wide ``ShotMapRenderer``"""
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = ShotMapRenderer()
+    return _default_renderer.render(df_shots, player_name, outcome, dpi, version)